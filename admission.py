@@ -0,0 +1,173 @@
+from collections import deque
+from contextlib import contextmanager
+import math
+import os
+import threading
+import time
+
+
+class AdmissionRejected(Exception):
+    """Raised when a stage is at its concurrency limit and its wait queue is full (or the wait timed out)"""
+
+    def __init__(self, stage, retry_after):
+        super().__init__(f"The {stage} stage is busy, please retry in {retry_after}s")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StageGate:
+    """Concurrency limit with a bounded wait queue for one pipeline stage"""
+
+    def __init__(self, name, limit, queue_depth, max_wait):
+        self.name = name
+        self.limit = limit
+        self.queue_depth = queue_depth
+        self.max_wait = max_wait
+
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        # Recent queue waits and service times, for percentiles and Retry-After estimates
+        self._waits = deque(maxlen=500)
+        self._service = deque(maxlen=100)
+        self.stats = {
+            'admitted': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'wait_seconds': 0.0,
+        }
+
+    @contextmanager
+    def admit(self, timeout=None):
+        """Hold one of the stage's slots for the with-block, waiting in its queue if needed"""
+        release = self.acquire(timeout=timeout)
+        try:
+            yield
+        finally:
+            release()
+
+    def acquire(self, wait=True, timeout=None):
+        """
+        Take one of the stage's slots, waiting in its queue if needed, and return its release()
+
+        For work that outlives the caller (e.g. a background AI call), release() is called when
+        that work ends; calling it again does nothing. With wait=False, returns None instead of
+        queueing when no slot is free. timeout shortens the queue wait below max_wait (e.g. to
+        what is left of a job's deadline).
+        """
+        started = time.monotonic()
+        with self._condition:
+            if self._active >= self.limit:
+                if not wait:
+                    return None
+                if self._waiting >= self.queue_depth:
+                    self.stats['rejected'] += 1
+                    raise AdmissionRejected(self.name, self._retry_after())
+                self._waiting += 1
+                try:
+                    max_wait = self.max_wait if timeout is None else min(self.max_wait, timeout)
+                    admitted = self._condition.wait_for(lambda: self._active < self.limit, max_wait)
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self.stats['timeouts'] += 1
+                    raise AdmissionRejected(self.name, self._retry_after())
+            self._active += 1
+            waited = time.monotonic() - started
+            self._waits.append(waited)
+            self.stats['admitted'] += 1
+            self.stats['wait_seconds'] += waited
+
+        entered = time.monotonic()
+        released = threading.Event()
+
+        def release():
+            with self._condition:
+                if released.is_set():
+                    return
+                released.set()
+                self._active -= 1
+                self._service.append(time.monotonic() - entered)
+                self._condition.notify()
+
+        return release
+
+    def saturated(self):
+        """True when a new arrival would be rejected outright"""
+        with self._condition:
+            return self._active >= self.limit and self._waiting >= self.queue_depth
+
+    def retry_after(self):
+        with self._condition:
+            return self._retry_after()
+
+    def _retry_after(self):
+        # Roughly how long until everything queued now has been served
+        service = sum(self._service) / len(self._service) if self._service else 1.0
+        return max(1, math.ceil(service * (self._waiting + 1) / self.limit))
+
+    def get_stats(self):
+        """Return counters, current occupancy and queue-wait percentiles"""
+        with self._condition:
+            waits = sorted(self._waits)
+            return dict(
+                self.stats,
+                active=self._active,
+                waiting=self._waiting,
+                limit=self.limit,
+                queue_depth=self.queue_depth,
+                wait_p50=waits[len(waits) // 2] if waits else None,
+                wait_p95=waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else None,
+                wait_max=waits[-1] if waits else None,
+                retry_after=self._retry_after()
+            )
+
+
+class AdmissionController:
+    """Separate gates for the scrape, LLM and PDF stages"""
+
+    def __init__(self):
+        max_wait = float(os.getenv('ADMIT_MAX_WAIT', '30'))
+        defaults = {
+            'scrape': (os.getenv('BROWSER_POOL_SIZE', '2'), '8'),
+            'llm': (os.getenv('LLM_MAX_WORKERS', '8'), '32'),
+            'pdf': (str(os.cpu_count() or 2), '16'),
+        }
+        self.gates = {
+            stage: StageGate(
+                stage,
+                int(os.getenv(f'ADMIT_{stage.upper()}_LIMIT', limit)),
+                int(os.getenv(f'ADMIT_{stage.upper()}_QUEUE', queue_depth)),
+                max_wait
+            )
+            for stage, (limit, queue_depth) in defaults.items()
+        }
+
+    def admit(self, stage, timeout=None):
+        return self.gates[stage].admit(timeout)
+
+    def acquire(self, stage, wait=True, timeout=None):
+        return self.gates[stage].acquire(wait, timeout)
+
+    def saturated(self, stages=None):
+        """Return the first of the stages that would reject a new arrival, or None"""
+        for stage in stages or self.gates:
+            if self.gates[stage].saturated():
+                return self.gates[stage]
+        return None
+
+    def get_stats(self):
+        return {stage: gate.get_stats() for stage, gate in self.gates.items()}
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission():
+    """Return the process-wide admission controller"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
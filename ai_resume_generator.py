@@ -1,54 +1,449 @@
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
 import json
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from prompt_builder import PromptBuilder
+from llm_client import get_llm_client, is_retryable
+from resume_document import ResumeDocument, RESUME_SCHEMA
+from section_headers import match_header
+from llm_backends import get_llm_backend
 
 # Load environment variables
 load_dotenv()
 
-class ResumeGenerator:
+# Independent sections generated concurrently in parallel mode, with the profile fields each needs
+RESUME_SECTIONS = [
+    {
+        'title': 'PROFESSIONAL SUMMARY',
+        'fields': ['name', 'headline', 'about'],
+        'instructions': '2-3 sentences highlighting key strengths'
+    },
+    {
+        'title': 'CORE COMPETENCIES',
+        'fields': ['headline', 'skills'],
+        'instructions': 'bullet points of key skills'
+    },
+    {
+        'title': 'PROFESSIONAL EXPERIENCE',
+        'fields': ['experience'],
+        'instructions': 'detailed bullet points with achievements for each role'
+    },
+    {
+        'title': 'EDUCATION',
+        'fields': ['education'],
+        'instructions': 'one line per degree with the institution'
+    },
+    {
+        'title': 'TECHNICAL SKILLS',
+        'fields': ['skills'],
+        'instructions': 'grouped, comma-separated technical skills'
+    },
+]
+
+
+def response_text(response):
+    """Text of a response or stream chunk; '' when the model returned no usable content"""
+    # .text raises ValueError for a blocked or empty candidate: an answer, not a model failure
+    try:
+        return response.text or ''
+    except ValueError as e:
+        print(f"AI response has no text: {str(e)}")
+        return ''
+
+class IncrementalResumeParser:
+    """Split AI response text into sections as it arrives, chunk by chunk"""
+    
     def __init__(self):
-        """Initialize the AI resume generator with Gemini API"""
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        
-        genai.configure(api_key=api_key)
-        
-        # Try different model names (most likely working ones first)
-        self.model = None
-        model_names = [
-            'gemini-1.5-flash',
-            'gemini-1.5-pro',
-            'models/gemini-1.5-flash', 
-            'models/gemini-1.5-pro'
-        ]
-        
-        for model_name in model_names:
+        self.text = []
+        self.sections = {}
+        self.current_section = None
+        self.current_content = []
+        self._pending = ''
+    
+    def feed(self, chunk):
+        """Consume a chunk of text and return sections completed by it"""
+        self.text.append(chunk)
+        self._pending += chunk
+        *lines, self._pending = self._pending.split('\n')
+        
+        completed = []
+        for line in lines:
+            completed.extend(self._add_line(line))
+        return completed
+    
+    def finish(self):
+        """Flush buffered text and return the remaining sections"""
+        completed = self._add_line(self._pending)
+        self._pending = ''
+        
+        # Add last section
+        if self.current_section:
+            completed.append(self._close_section())
+        return completed
+    
+    def result(self):
+        """Structured resume data in the parse_resume_response format"""
+        return {
+            'formatted_content': ''.join(self.text),
+            'sections': self.sections
+        }
+    
+    def _add_line(self, line):
+        line = line.strip()
+        if not line:
+            return []
+        
+        # Check if line is a section header
+        header = match_header(line)
+        if header:
+            completed = [self._close_section()] if self.current_section else []
+            self.current_section, rest = header
+            self.current_content = [rest] if rest else []
+            return completed
+        
+        self.current_content.append(line)
+        return []
+    
+    def _close_section(self):
+        content = '\n'.join(self.current_content)
+        self.sections[self.current_section] = content
+        return self.current_section, content
+
+class ModelResolver:
+    """Resolve a working model once per process and persist the choice with a TTL"""
+    
+    def __init__(self, backend, cache_path=None, ttl=None):
+        self.backend = backend
+        if cache_path is None and backend.name == 'gemini':
+            cache_path = os.getenv('GEMINI_MODEL_CACHE')
+        self.cache_path = cache_path or os.path.join('cache', f'{backend.name}_model.json')
+        self.ttl = ttl if ttl is not None else float(os.getenv('GEMINI_MODEL_TTL', '21600'))
+        self.model_name = None
+        self.resolved_at = 0
+        self._lock = threading.Lock()
+        self._revalidating = False
+    
+    def resolve(self):
+        """Return a working model name, probing only when nothing usable is cached"""
+        with self._lock:
+            if self.model_name is None:
+                self.load()
+            
+            if self.model_name is None:
+                self.model_name = self.probe()
+                self.resolved_at = time.time()
+                self.save()
+            elif self.is_stale() and not self._revalidating:
+                # Keep serving the known model while a background probe refreshes it
+                self._revalidating = True
+                threading.Thread(target=self.revalidate, daemon=True).start()
+            
+            return self.model_name
+    
+    def is_stale(self):
+        return bool(self.ttl) and time.time() - self.resolved_at > self.ttl
+    
+    def probe(self):
+        """Find the first model that answers a test request"""
+        for model_name in self.backend.model_names:
             try:
-                self.model = genai.GenerativeModel(model_name)
                 # Test the model with a simple request
-                test_response = self.model.generate_content("Hello")
+                self.backend.probe(model_name)
                 print(f"✅ Using model: {model_name}")
-                break
+                return model_name
             except Exception as e:
                 print(f"❌ Model {model_name} failed: {str(e)}")
                 continue
         
-        if not self.model:
-            raise ValueError("No working Gemini model found")
+        raise ValueError(f"No working {self.backend.name} model found")
+    
+    def revalidate(self):
+        """Re-probe in the background and swap in the result"""
+        try:
+            model_name = self.probe()
+            with self._lock:
+                self.model_name = model_name
+                self.resolved_at = time.time()
+                self.save()
+        except Exception as e:
+            print(f"Model revalidation failed: {str(e)}")
+        finally:
+            self._revalidating = False
+    
+    def invalidate(self, model_name=None):
+        """Forget the cached model (only if it is still the one that failed)"""
+        with self._lock:
+            if model_name and model_name != self.model_name:
+                return
+            print(f"🔄 Invalidating cached model {self.model_name}")
+            self.model_name = None
+            self.resolved_at = 0
+            try:
+                os.remove(self.cache_path)
+            except FileNotFoundError:
+                pass
+    
+    def load(self):
+        """Load a persisted, unexpired model choice"""
+        try:
+            with open(self.cache_path, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        if cached.get('model_name') in self.backend.model_names:
+            self.model_name = cached['model_name']
+            self.resolved_at = cached.get('resolved_at', 0)
     
-    def generate_resume_content(self, profile_data, job_title=None):
-        """Generate professional resume content using AI"""
+    def save(self):
+        """Persist the model choice so other processes and restarts skip the probe"""
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.cache_path, 'w') as f:
+                json.dump({'model_name': self.model_name, 'resolved_at': self.resolved_at}, f)
+        except OSError as e:
+            print(f"Could not persist model choice: {str(e)}")
+
+class ResponseCache:
+    """Two-tier (memory LRU + disk) cache of parsed AI responses keyed by prompt and model"""
+    
+    def __init__(self, directory=None, ttl=None, max_memory_bytes=None, max_disk_bytes=None):
+        self.directory = directory or os.getenv('RESPONSE_CACHE_DIR', os.path.join('cache', 'responses'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('RESPONSE_CACHE_TTL', '604800'))
+        self.max_memory_bytes = max_memory_bytes or int(float(os.getenv('RESPONSE_CACHE_MEMORY_MB', '16')) * 1024 * 1024)
+        self.max_disk_bytes = max_disk_bytes or int(float(os.getenv('RESPONSE_CACHE_DISK_MB', '200')) * 1024 * 1024)
+        
+        self._memory = OrderedDict()  # key -> (stored_at, size, result)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+        }
+    
+    @staticmethod
+    def make_key(prompt, model_name):
+        """Content address for a rendered prompt sent to a given model"""
+        return hashlib.sha256(f"{model_name}\0{prompt}".encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """Return the cached parsed result, or None"""
+        now = time.time()
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and not self._expired(entry[0], now):
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return entry[2]
+            if entry:
+                self._drop_memory(key)
+        
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        
+        if self._expired(stored['stored_at'], now):
+            self._remove_file(path)
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        
+        # Touch the file so disk eviction approximates LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        
+        with self._lock:
+            self.stats['disk_hits'] += 1
+            self._store_memory(key, stored['stored_at'], stored['result'])
+        return stored['result']
+    
+    def put(self, key, result):
+        """Store a parsed result in both tiers"""
+        now = time.time()
+        payload = json.dumps({'stored_at': now, 'result': result})
+        
+        with self._lock:
+            self.stats['stores'] += 1
+            self._store_memory(key, now, result, len(payload))
+        
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            print(f"Could not write response cache: {str(e)}")
+    
+    def _expired(self, stored_at, now):
+        return bool(self.ttl) and now - stored_at > self.ttl
+    
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def _store_memory(self, key, stored_at, result, size=None):
+        if size is None:
+            size = len(json.dumps(result))
+        if key in self._memory:
+            self._drop_memory(key)
+        self._memory[key] = (stored_at, size, result)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            oldest = next(iter(self._memory))
+            self._drop_memory(oldest)
+            self.stats['memory_evictions'] += 1
+    
+    def _drop_memory(self, key):
+        _, size, _ = self._memory.pop(key)
+        self._memory_bytes -= size
+    
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove_file(path)
+            total -= size
+            with self._lock:
+                self.stats['disk_evictions'] += 1
+    
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def get_stats(self):
+        """Return hit/miss/eviction counters and memory tier size"""
+        with self._lock:
+            stats = dict(self.stats, memory_entries=len(self._memory), memory_bytes=self._memory_bytes)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+_model_resolvers = {}
+_resolver_lock = threading.Lock()
+_response_cache = ResponseCache()
+_generator = None
+_generator_lock = threading.Lock()
+
+def get_model_resolver(backend):
+    """Return the process-wide model resolver for a backend"""
+    with _resolver_lock:
+        if backend.name not in _model_resolvers:
+            _model_resolvers[backend.name] = ModelResolver(backend)
+        return _model_resolvers[backend.name]
+
+def get_resume_generator():
+    """Return the process-wide ResumeGenerator"""
+    global _generator
+    with _generator_lock:
+        if _generator is None:
+            _generator = ResumeGenerator()
+        return _generator
+
+class ResumeGenerator:
+    def __init__(self, backend=None, resolver=None, response_cache=None, prompt_builder=None, llm_client=None):
+        """Initialize the AI resume generator with the configured LLM backend (Gemini by default)"""
+        self.backend = backend or get_llm_backend()
+        self.resolver = resolver or get_model_resolver(self.backend)
+        self.response_cache = response_cache or _response_cache
+        self.llm_client = llm_client or get_llm_client()
+        # Keeps generations running after their request has given up waiting on them
+        self.background = ThreadPoolExecutor(
+            max_workers=int(os.getenv('LLM_MAX_WORKERS', '8')), thread_name_prefix='resume'
+        )
+        # How many late AI results may be pending as upgrades, and how late one may still land
+        self.upgrade_slots = threading.BoundedSemaphore(int(os.getenv('RESUME_MAX_PENDING_UPGRADES', '8')))
+        self.upgrade_window = float(os.getenv('RESUME_UPGRADE_WINDOW', '120'))
+        # Section calls started before the profile is complete; separate so they never queue behind
+        # the generations that end up waiting on them
+        self.prefetch = ThreadPoolExecutor(
+            max_workers=int(os.getenv('LLM_MAX_WORKERS', '8')), thread_name_prefix='resume-prefetch'
+        )
+        self._models = {}
+        self.model_name, self.model = self.resolve_model()
+        
+        # PROMPT_TOKEN_COUNTER=api measures prompts with the model's count_tokens instead of the local estimate
+        count_tokens = None
+        if os.getenv('PROMPT_TOKEN_COUNTER', 'local') == 'api':
+            count_tokens = lambda text: self.model.count_tokens(text).total_tokens
+        self.prompt_builder = prompt_builder or PromptBuilder(count_tokens=count_tokens)
+    
+    def resolve_model(self):
+        """Return (model_name, model) for the currently resolved model"""
+        model_name = self.resolver.resolve()
+        if model_name not in self._models:
+            self._models[model_name] = self.backend.get_model(model_name)
+        return model_name, self._models[model_name]
+    
+    def model_failed(self, model_name, error):
+        """Forget the resolved model only when the error says it is unusable (retired, no access, bad request)"""
+        # Throttling, timeouts and outages pass; re-probing then would only stall every request
+        if not is_retryable(error):
+            self.resolver.invalidate(model_name)
+    
+    def generate_resume_content(self, profile_data, job_title=None, use_cache=True, mode=None, in_flight=None):
+        """Generate professional resume content using AI (use_cache=False forces fresh output)"""
+        # 'single' sends one prompt for the whole resume, 'parallel' one prompt per section,
+        # 'structured' asks for JSON matching RESUME_SCHEMA
+        mode = mode or os.getenv('RESUME_GENERATION_MODE', 'single')
+        if mode == 'parallel':
+            return self.generate_resume_sections(profile_data, job_title, use_cache, in_flight)
+        if mode == 'structured':
+            return self.generate_resume_document(profile_data, job_title, use_cache)
+        
         try:
             # Create detailed prompt for resume generation
             prompt = self.create_resume_prompt(profile_data, job_title)
+            model_name, model = self.resolve_model()
+            
+            cache_key = self.response_cache.make_key(prompt, model_name)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached:
+                    print("📦 Using cached resume content")
+                    return cached
             
             print("🤖 Generating resume content with AI...")
-            response = self.model.generate_content(prompt)
+            try:
+                response = self.llm_client.generate(model, prompt)
+            except Exception as e:
+                self.model_failed(model_name, e)
+                raise
             
-            if response.text:
-                return self.parse_resume_response(response.text)
+            text = response_text(response)
+            if text:
+                result = self.parse_resume_response(text)
+                self.response_cache.put(cache_key, result)
+                return result
             else:
                 return self.create_fallback_resume(profile_data)
                 
@@ -56,9 +451,274 @@ class ResumeGenerator:
             print(f"AI generation error: {str(e)}")
             return self.create_fallback_resume(profile_data)
     
-    def create_resume_prompt(self, profile_data, job_title):
-        """Create a detailed prompt for AI resume generation"""
+    def generate_resume_content_by_deadline(self, profile_data, job_title=None, deadline=None,
+                                            on_upgrade=None, on_chunk=None, on_finish=None, **kwargs):
+        """
+        Generate resume content, serving the fallback resume if the AI misses the deadline
+        
+        Args:
+            deadline (float): Seconds to wait for the AI (RESUME_LLM_DEADLINE by default)
+            on_upgrade (callable): Called with the AI result if it lands after the deadline
+            on_chunk (callable): Called with each piece of text as the AI writes it (single mode)
+            on_finish (callable): Called once the AI call is over, finished or cancelled, which
+                may be well after the deadline
+            
+        Returns:
+            tuple: (resume_data, degraded) where degraded means the fallback was served
+        """
+        deadline = deadline or float(os.getenv('RESUME_LLM_DEADLINE', '20'))
+        future = self.background.submit(self.generate_streamed, profile_data, job_title, on_chunk, **kwargs)
+        if on_finish:
+            future.add_done_callback(lambda done: on_finish())
+        
+        try:
+            return future.result(timeout=deadline), False
+        except FutureTimeoutError:
+            print(f"⏰ AI missed the {deadline:.1f}s deadline, serving fallback resume")
+        
+        fallback = self.create_fallback_resume(profile_data)
+        if future.cancel():
+            # Never got a worker; don't leave it queued to run long after the request moved on
+            return fallback, True
+        if not on_upgrade or not self.upgrade_slots.acquire(blocking=False):
+            # Too many upgrades pending already; the running call finishes but its result is dropped
+            return fallback, True
+        
+        missed_at = time.monotonic()
+        
+        def upgrade(done):
+            try:
+                result = done.result()
+                if result.get('fallback'):
+                    return
+                if time.monotonic() - missed_at > self.upgrade_window:
+                    print(f"⌛ AI result arrived more than {self.upgrade_window:.0f}s late, not upgrading")
+                    return
+                on_upgrade(result)
+            except Exception as e:
+                print(f"Error upgrading resume: {str(e)}")
+            finally:
+                self.upgrade_slots.release()
+        
+        future.add_done_callback(upgrade)
+        return fallback, True
+    
+    def generate_streamed(self, profile_data, job_title=None, on_chunk=None, use_cache=True, mode=None, **kwargs):
+        """generate_resume_content, passing the text to on_chunk as it is written when the mode streams"""
+        if on_chunk is None or (mode or os.getenv('RESUME_GENERATION_MODE', 'single')) != 'single':
+            return self.generate_resume_content(profile_data, job_title, use_cache, mode, **kwargs)
+        
+        for event in self.stream_resume_content(profile_data, job_title, use_cache):
+            if event['type'] == 'chunk':
+                on_chunk(event['text'])
+            elif event['type'] == 'done':
+                return event['result']
+    
+    def generate_resume_document(self, profile_data, job_title=None, use_cache=True):
+        """Generate a validated ResumeDocument using Gemini's JSON response schema"""
+        try:
+            prompt = self.create_resume_prompt(profile_data, job_title, output_format='json')
+            model_name, model = self.resolve_model()
+            
+            cache_key = self.response_cache.make_key(prompt, model_name)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached:
+                    print("📦 Using cached resume content")
+                    return cached
+            
+            print("🤖 Generating structured resume with AI...")
+            try:
+                response = self.llm_client.generate(model, prompt, generation_config={
+                    'response_mime_type': 'application/json',
+                    'response_schema': RESUME_SCHEMA
+                })
+            except Exception as e:
+                self.model_failed(model_name, e)
+                raise
+            
+            document = ResumeDocument.from_json(response_text(response))
+            result = {
+                'formatted_content': document.to_text(),
+                'sections': document.to_sections(),
+                'document': document.to_dict()
+            }
+            self.response_cache.put(cache_key, result)
+            return result
+            
+        except Exception as e:
+            print(f"AI generation error: {str(e)}")
+            return self.create_fallback_resume(profile_data)
+    
+    def starts_early(self, mode=None):
+        """Whether start_sections can start anything (only parallel mode has independent sections)"""
+        return (mode or os.getenv('RESUME_GENERATION_MODE', 'single')) == 'parallel'
+    
+    def start_sections(self, profile_data, job_title=None, fields=(), in_flight=None, mode=None, use_cache=True,
+                       acquire=None):
+        """
+        Start generating the sections whose profile fields are all available already
+        
+        Lets the summary be written from the header while the rest of the profile is
+        still being scraped. Only parallel mode has independent sections to start.
+        
+        Args:
+            fields (iterable): Profile fields that are final
+            in_flight (dict): Sections already started by an earlier call, added to in place
+            use_cache (bool): Skip sections whose response is cached already
+            acquire (callable): Returns a release() held for the call's duration, or None to
+                skip starting it (e.g. a non-blocking admission slot)
+            
+        Returns:
+            dict: prompt -> future of the LLM response, for generate_resume_sections(in_flight=...)
+        """
+        in_flight = {} if in_flight is None else in_flight
+        if not self.starts_early(mode):
+            return in_flight
+        
+        model_name, model = self.resolve_model()
+        for section in RESUME_SECTIONS:
+            if set(section['fields']) <= set(fields):
+                prompt = self.create_section_prompt(section, profile_data, job_title)
+                if prompt in in_flight:
+                    continue
+                if use_cache and self.response_cache.get(self.response_cache.make_key(prompt, model_name)):
+                    continue
+                release = acquire() if acquire else None
+                if acquire and release is None:
+                    continue  # no capacity now; the section is generated with the rest later
+                in_flight[prompt] = self.prefetch.submit(self.llm_client.generate, model, prompt)
+                if release:
+                    in_flight[prompt].add_done_callback(lambda done, release=release: release())
+                print(f"🏁 Started {section['title']} before the profile finished loading")
+        return in_flight
+    
+    def generate_resume_sections(self, profile_data, job_title=None, use_cache=True, in_flight=None):
+        """
+        Generate each section from its own prompt concurrently and merge the results
+        
+        Args:
+            in_flight (dict): Prompt -> in-flight response from start_sections; a section whose
+                prompt is unchanged now that the full profile is known reuses that call
+        """
+        try:
+            model_name, model = self.resolve_model()
+            prompts = [self.create_section_prompt(section, profile_data, job_title) for section in RESUME_SECTIONS]
+            
+            cache_key = self.response_cache.make_key('\0'.join(prompts), model_name)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached:
+                    print("📦 Using cached resume content")
+                    return cached
+            
+            print(f"🤖 Generating {len(prompts)} resume sections in parallel...")
+            started = time.monotonic()
+            try:
+                texts = asyncio.run(self._generate_all(model, model_name, prompts, in_flight, use_cache))
+            except Exception as e:
+                self.model_failed(model_name, e)
+                raise
+            print(f"⏱️ Sections generated in {time.monotonic() - started:.2f}s")
+            
+            result = self.merge_sections(profile_data, texts)
+            self.response_cache.put(cache_key, result)
+            return result
+            
+        except Exception as e:
+            print(f"AI generation error: {str(e)}")
+            return self.create_fallback_resume(profile_data)
+    
+    async def _generate_all(self, model, model_name, prompts, in_flight=None, use_cache=True):
+        in_flight = in_flight or {}
+        reused = sum(1 for prompt in prompts if prompt in in_flight)
+        if reused:
+            print(f"♻️ Reusing {reused} section(s) started early")
+        
+        async def generate(prompt):
+            # Each section is cached on its own too, so early calls can be skipped on a repeat
+            key = self.response_cache.make_key(prompt, model_name)
+            cached = self.response_cache.get(key) if use_cache else None
+            if cached:
+                return cached['text']
+            if prompt in in_flight:
+                response = await asyncio.wrap_future(in_flight[prompt])
+            else:
+                response = await self.llm_client.generate_async(model, prompt)
+            text = response_text(response)
+            if text:
+                self.response_cache.put(key, {'text': text})
+            return text
+        
+        return await asyncio.gather(*(generate(prompt) for prompt in prompts))
+    
+    def create_section_prompt(self, section, profile_data, job_title):
+        """Create a prompt for one resume section, trimmed to the token budget"""
+        prompt, _ = self.prompt_builder.fit(
+            profile_data, job_title, lambda data: self.render_section_prompt(section, data, job_title)
+        )
+        return prompt
+    
+    def render_section_prompt(self, section, profile_data, job_title):
+        """Render a section prompt containing only the profile fields that section needs"""
         job_focus = f" for a {job_title} position" if job_title else ""
+        field_renderers = {
+            'name': lambda: f"Name: {profile_data.get('name', 'Not provided')}",
+            'headline': lambda: f"Current Role: {profile_data.get('headline', 'Not provided')}",
+            'about': lambda: f"About: {profile_data.get('about', 'Not provided')}",
+            'experience': lambda: f"Experience:\n{self.format_experience_for_prompt(profile_data.get('experience', []))}",
+            'education': lambda: f"Education:\n{self.format_education_for_prompt(profile_data.get('education', []))}",
+            'skills': lambda: f"Skills: {', '.join(profile_data.get('skills', []))}",
+        }
+        profile_text = '\n\n'.join(field_renderers[field]() for field in section['fields'])
+        
+        return f"""
+        Write only the {section['title']} section ({section['instructions']}) of a professional resume{job_focus}, based on the following LinkedIn profile data:
+
+        {profile_text}
+
+        Guidelines:
+        - Use action verbs and quantifiable achievements where possible
+        - Keep bullet points concise but impactful
+        - Tailor content to be ATS-friendly
+        - Output the section content only, without the section header or any other section
+        """
+    
+    def merge_sections(self, profile_data, texts):
+        """Merge per-section outputs into the parse_resume_response structure"""
+        sections = {}
+        parts = [profile_data.get('name', ''), profile_data.get('location', '')]
+        
+        for section, text in zip(RESUME_SECTIONS, texts):
+            lines = text.strip().split('\n')
+            # Drop a repeated header if the model added one anyway
+            if lines and match_header(lines[0].strip()):
+                lines = lines[1:]
+            content = '\n'.join(line.strip() for line in lines if line.strip())
+            if not content:
+                continue
+            sections[section['title']] = content
+            parts.append(f"\n{section['title']}\n{content}")
+        
+        return {
+            'formatted_content': '\n'.join(part for part in parts if part).strip(),
+            'sections': sections
+        }
+    
+    def create_resume_prompt(self, profile_data, job_title, output_format='text'):
+        """Create a detailed prompt for AI resume generation, trimmed to the token budget"""
+        prompt, _ = self.prompt_builder.fit(
+            profile_data, job_title, lambda data: self.render_resume_prompt(data, job_title, output_format)
+        )
+        return prompt
+    
+    def render_resume_prompt(self, profile_data, job_title, output_format='text'):
+        """Render the resume prompt template for the given profile data"""
+        job_focus = f" for a {job_title} position" if job_title else ""
+        if output_format == 'json':
+            format_instructions = "Return the resume as JSON matching the response schema, one field per section."
+        else:
+            format_instructions = "Format the response as structured text with clear section headers."
         
         prompt = f"""
         Create a professional resume{job_focus} based on the following LinkedIn profile data:
@@ -90,7 +750,7 @@ class ResumeGenerator:
         - Make it professional and modern
         - Focus on results and impact
 
-        Format the response as structured text with clear section headers.
+        {format_instructions}
         """
         
         return prompt
@@ -102,6 +762,10 @@ class ResumeGenerator:
         
         formatted = []
         for exp in experiences:
+            # The scraper returns each entry as raw text
+            if isinstance(exp, str):
+                formatted.append(f"- {exp}")
+                continue
             exp_text = f"- {exp.get('title', 'Unknown')}"
             if exp.get('company'):
                 exp_text += f" at {exp['company']}"
@@ -118,6 +782,9 @@ class ResumeGenerator:
         
         formatted = []
         for edu in education:
+            if isinstance(edu, str):
+                formatted.append(f"- {edu}")
+                continue
             edu_text = f"- {edu.get('degree', 'Unknown degree')}"
             if edu.get('school'):
                 edu_text += f" from {edu['school']}"
@@ -128,40 +795,10 @@ class ResumeGenerator:
     def parse_resume_response(self, ai_response):
         """Parse AI response into structured resume data"""
         try:
-            # Split response into sections
-            sections = {}
-            current_section = None
-            current_content = []
-            
-            lines = ai_response.split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check if line is a section header
-                if any(header in line.upper() for header in [
-                    'PROFESSIONAL SUMMARY', 'SUMMARY', 'OBJECTIVE',
-                    'CORE COMPETENCIES', 'SKILLS', 'TECHNICAL SKILLS',
-                    'PROFESSIONAL EXPERIENCE', 'EXPERIENCE', 'WORK EXPERIENCE',
-                    'EDUCATION', 'ACADEMIC BACKGROUND'
-                ]):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = line
-                    current_content = []
-                else:
-                    current_content.append(line)
-            
-            # Add last section
-            if current_section:
-                sections[current_section] = '\n'.join(current_content)
-            
-            return {
-                'formatted_content': ai_response,
-                'sections': sections
-            }
+            parser = IncrementalResumeParser()
+            parser.feed(ai_response)
+            parser.finish()
+            return parser.result()
             
         except Exception as e:
             print(f"Error parsing AI response: {str(e)}")
@@ -170,6 +807,52 @@ class ResumeGenerator:
                 'sections': {}
             }
     
+    def stream_resume_content(self, profile_data, job_title=None, use_cache=True):
+        """Stream resume generation as events: 'chunk' text, completed 'section's, then 'done'"""
+        try:
+            prompt = self.create_resume_prompt(profile_data, job_title)
+            model_name, model = self.resolve_model()
+            
+            cache_key = self.response_cache.make_key(prompt, model_name)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached:
+                    print("📦 Using cached resume content")
+                    yield {'type': 'chunk', 'text': cached['formatted_content']}
+                    for title, content in cached['sections'].items():
+                        yield {'type': 'section', 'title': title, 'content': content}
+                    yield {'type': 'done', 'result': cached}
+                    return
+            
+            print("🤖 Streaming resume content with AI...")
+            parser = IncrementalResumeParser()
+            try:
+                response = self.llm_client.generate(model, prompt, stream=True)
+                for chunk in response:
+                    text = response_text(chunk)
+                    if not text:
+                        continue
+                    yield {'type': 'chunk', 'text': text}
+                    for title, content in parser.feed(text):
+                        yield {'type': 'section', 'title': title, 'content': content}
+            except Exception as e:
+                self.model_failed(model_name, e)
+                raise
+            
+            for title, content in parser.finish():
+                yield {'type': 'section', 'title': title, 'content': content}
+            
+            result = parser.result()
+            if result['formatted_content'].strip():
+                self.response_cache.put(cache_key, result)
+            else:
+                result = self.create_fallback_resume(profile_data)
+            yield {'type': 'done', 'result': result}
+            
+        except Exception as e:
+            print(f"AI streaming error: {str(e)}")
+            yield {'type': 'done', 'result': self.create_fallback_resume(profile_data)}
+    
     def create_fallback_resume(self, profile_data):
         """Create a basic resume if AI generation fails"""
         print("🔄 Creating fallback resume...")
@@ -186,6 +869,10 @@ PROFESSIONAL EXPERIENCE
         
         # Add experiences
         for exp in profile_data.get('experience', []):
+            # The scraper returns each entry as raw text
+            if isinstance(exp, str):
+                resume_content += f"\n{exp}\n"
+                continue
             resume_content += f"\n{exp.get('title', 'Position')}"
             if exp.get('company'):
                 resume_content += f" | {exp['company']}"
@@ -197,6 +884,9 @@ PROFESSIONAL EXPERIENCE
         if profile_data.get('education'):
             resume_content += "\nEDUCATION\n"
             for edu in profile_data['education']:
+                if isinstance(edu, str):
+                    resume_content += f"{edu}\n"
+                    continue
                 resume_content += f"{edu.get('degree', 'Degree')} | {edu.get('school', 'Institution')}\n"
         
         # Add skills
@@ -205,13 +895,14 @@ PROFESSIONAL EXPERIENCE
         
         return {
             'formatted_content': resume_content.strip(),
-            'sections': {}
+            'sections': {},
+            'fallback': True
         }
 
 # Test function
 if __name__ == "__main__":
     try:
-        generator = ResumeGenerator()
+        generator = get_resume_generator()
         
         # Test data
         test_profile = {
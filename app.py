@@ -1,15 +1,42 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import os
+import json
+import threading
+import time
 import uuid
 from datetime import datetime
-from ai_resume_generator import ResumeGenerator  # Fixed import name
-from linkedin_scraper import LinkedInScraper
-from pdf_generator import  PDFResumeGenerator
+from ai_resume_generator import get_resume_generator
+from browser_pool import get_driver_pool
+from profile_cache import get_profile_cache, normalize_linkedin_url
+from pdf_worker_pool import render_pdf, get_pdf_worker_pool
+from output_store import get_output_store
+from resume_renderer import render_previews
+from job_queue import get_job_queue, JobQueueFull, JobCancelled
+from session_store import get_session_store
+from progress_bus import get_progress_bus
+from pipeline import warm_up, load_profile, load_profile_early
+from single_flight import get_single_flight
+from admission import get_admission, AdmissionRejected
 
 app = Flask(__name__)
 
-# Global variables to store progress
-current_progress = {}
+# Sessions (progress, resume text, PDF and previews) live in a bounded, expiring store
+sessions = get_session_store()
+# Stage changes are pushed to /progress subscribers as they happen
+progress_bus = get_progress_bus()
+
+# Running /generate jobs keyed by profile and job title, so duplicates attach instead of rerunning
+in_flight = get_single_flight()
+
+# Session fields published to progress subscribers
+PROGRESS_FIELDS = ('status', 'progress', 'error', 'degraded', 'upgraded')
+
+# Progress reported as the scrape yields each part of the profile
+SCRAPE_PROGRESS = {
+    'header': ('Reading profile details...', 30),
+    'experience': ('Reading experience...', 40),
+    'education': ('Reading education and skills...', 50),
+}
 
 @app.route('/')
 def index():
@@ -20,31 +47,31 @@ def generate_resume():
     try:
         linkedin_url = request.form['linkedin_url']
         job_title = request.form.get('job_title', '')
+        force_refresh = is_flag_set(request.form, 'force_refresh')
+        fresh = is_flag_set(request.form, 'fresh')
         
-        # Generate unique session ID
-        session_id = str(uuid.uuid4())
-        current_progress[session_id] = {
-            'status': 'Starting...',
-            'progress': 0,
-            'resume_content': '',
-            'error': None
-        }
-        
-        # Start processing in background (for now, we'll do it synchronously)
-        result = process_resume(linkedin_url, job_title, session_id)
+        # Double submits and simultaneous requests for the same resume share one job and session;
+        # a refresh never joins a job that may serve cached data
+        key = (normalize_linkedin_url(linkedin_url), ' '.join(job_title.lower().split()), force_refresh, fresh)
+        try:
+            job, started = in_flight.join_or_start(
+                key, lambda: start_resume_job(key, linkedin_url, job_title, force_refresh, fresh)
+            )
+        except AdmissionRejected as e:
+            return busy_response(str(e), e.retry_after, 429)
+        except JobQueueFull:
+            return busy_response('The server is busy, please try again shortly.', get_job_queue().retry_after(), 503)
         
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'session_id': session_id,
-                'resume_content': result['resume_content'],
-                'message': 'Resume generated successfully!'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result['error']
-            })
+        # The session ID is the job ID; the client follows /status/<job_id>
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'session_id': job.id,
+            'status_url': f'/status/{job.id}',
+            'events_url': f'/progress/{job.id}/events',
+            'coalesced': not started,
+            'message': 'Resume generation started' if started else 'Joined a resume generation already in progress'
+        }), 202
             
     except Exception as e:
         return jsonify({
@@ -52,16 +79,187 @@ def generate_resume():
             'error': f'An error occurred: {str(e)}'
         })
 
-def process_resume(linkedin_url, job_title, session_id):
-    """Process LinkedIn URL and generate resume"""
+@app.route('/generate/stream')
+def generate_resume_stream():
+    """Generate a resume, streaming progress and AI output as Server-Sent Events"""
+    linkedin_url = request.args.get('linkedin_url', '')
+    job_title = request.args.get('job_title', '')
+    force_refresh = is_flag_set(request.args, 'force_refresh')
+    fresh = is_flag_set(request.args, 'fresh')
+    
+    if not linkedin_url:
+        return jsonify({'success': False, 'error': 'linkedin_url is required'}), 400
+    
+    try:
+        check_admission(linkedin_url, force_refresh)
+    except AdmissionRejected as e:
+        return busy_response(str(e), e.retry_after, 429)
+    
+    session_id = str(uuid.uuid4())
+    start_session(session_id, 'Starting...')
+    
+    events = stream_resume(linkedin_url, job_title, session_id, force_refresh, fresh)
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop proxies from buffering the stream
+    })
+
+def check_admission(linkedin_url, force_refresh=False):
+    """Turn a request away up front if a stage it needs has a full queue"""
+    stages = ['llm', 'pdf']
+    if force_refresh or not get_profile_cache().contains(linkedin_url):
+        stages.append('scrape')
+    busy = get_admission().saturated(stages)
+    if busy:
+        raise AdmissionRejected(busy.name, busy.retry_after())
+
+def busy_response(error, retry_after, status):
+    """A 429/503 JSON error telling the client when to try again"""
+    response = jsonify({'success': False, 'error': error, 'retry_after': retry_after})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def is_flag_set(params, name):
+    """Interpret a form/query parameter as a boolean flag"""
+    return params.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def start_session(session_id, status):
+    """Create a session and publish its first stage"""
+    sessions.create(session_id, {
+        'status': status,
+        'progress': 0,
+        'resume_content': '',
+        'error': None
+    })
+    progress_bus.publish(session_id, status=status, progress=0, error=None)
+
+def update_session(session_id, **fields):
+    """Update a session, pushing any stage change to its progress subscribers"""
+    if not sessions.update(session_id, **fields):
+        return False
+    changes = {key: value for key, value in fields.items() if key in PROGRESS_FIELDS}
+    if changes:
+        progress_bus.publish(session_id, **changes)
+    return True
+
+def set_progress(session_id, status, progress):
+    """Update a session's stage and return the public progress fields"""
+    update_session(session_id, status=status, progress=progress)
+    return {'status': status, 'progress': progress}
+
+def stream_resume(linkedin_url, job_title, session_id, force_refresh=False, fresh=False):
+    """Run the resume pipeline, yielding SSE events as each stage progresses"""
+    try:
+        yield sse_event('session', {'session_id': session_id})
+        yield sse_event('progress', set_progress(session_id, 'Scraping LinkedIn profile...', 20))
+        
+        profile_data = load_profile(linkedin_url, force_refresh)
+        
+        if not profile_data:
+            error = 'Failed to scrape LinkedIn profile. Please check the URL and try again.'
+            update_session(session_id, error=error)
+            yield sse_event('failed', {'error': error})
+            return
+        
+        yield sse_event('progress', set_progress(session_id, 'Generating resume with AI...', 60))
+        
+        resume_data = None
+        with get_admission().admit('llm'):
+            for event in get_resume_generator().stream_resume_content(profile_data, job_title, use_cache=not fresh):
+                if event['type'] == 'chunk':
+                    yield sse_event('chunk', {'text': event['text']})
+                elif event['type'] == 'section':
+                    yield sse_event('section', {'title': event['title'], 'content': event['content']})
+                else:
+                    resume_data = event['result']
+        
+        yield sse_event('progress', set_progress(session_id, 'Creating PDF...', 80))
+        
+        save_outputs(session_id, resume_data, profile_data)
+        
+        update_session(session_id, status='Complete!', progress=100, resume_content=resume_data['formatted_content'])
+        
+        yield sse_event('complete', {
+            'session_id': session_id,
+            'resume_content': resume_data['formatted_content'],
+            'message': 'Resume generated successfully!'
+        })
+        
+    except AdmissionRejected as e:
+        update_session(session_id, status=str(e), error=str(e), retry_after=e.retry_after)
+        yield sse_event('failed', {'error': str(e), 'retry_after': e.retry_after})
+    except Exception as e:
+        update_session(session_id, status=f'Error: {str(e)}', error=str(e))
+        yield sse_event('failed', {'error': str(e)})
+
+def start_resume_job(key, linkedin_url, job_title, force_refresh=False, fresh=False):
+    """Create a session and queue its job, leaving the in-flight registry when the job ends"""
+    check_admission(linkedin_url, force_refresh)
+    session_id = str(uuid.uuid4())
+    start_session(session_id, 'Queued')
+    
+    def on_finish(job):
+        finish_job(job)
+        in_flight.finish(key, job)
+    
+    try:
+        return get_job_queue().submit(
+            run_resume_job, linkedin_url, job_title, session_id, force_refresh, fresh,
+            job_id=session_id, on_finish=on_finish
+        )
+    except JobQueueFull:
+        sessions.delete(session_id)
+        progress_bus.discard(session_id)
+        raise
+
+def run_resume_job(linkedin_url, job_title, session_id, force_refresh=False, fresh=False, job=None):
+    """Job queue entry point: process_resume, failing the job when the pipeline reports an error"""
+    result = process_resume(linkedin_url, job_title, session_id, force_refresh, fresh, job)
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return result
+
+def finish_job(job):
+    """Record why a job ended without a resume (failure, cancellation or deadline)"""
+    if job.state != 'done':
+        status = job.error if job.state in ('cancelled', 'expired') else f'Error: {job.error}'
+        update_session(job.id, status=status, error=job.error)
+    # Workers that don't hold the job answer /status from its session
+    update_session(job.id, job_state=job.state)
+    # The AI draft is only streamed while the job runs
+    if progress_bus.version(job.id):
+        progress_bus.publish(job.id, draft=None)
+
+def process_resume(linkedin_url, job_title, session_id, force_refresh=False, fresh=False, job=None):
+    """Process LinkedIn URL and generate resume, checking the job for cancellation between stages"""
+    checkpoint = job.check if job else lambda: None
+    # Set once this job has stopped writing the session, so a late AI upgrade is never overwritten
+    settled = threading.Event()
     try:
         # Update progress
-        current_progress[session_id]['status'] = 'Scraping LinkedIn profile...'
-        current_progress[session_id]['progress'] = 20
+        checkpoint()
+        set_progress(session_id, 'Scraping LinkedIn profile...', 20)
+        started_at = time.monotonic()
+        timings = {}
         
-        # Initialize scraper
-        scraper = LinkedInScraper()
-        profile_data = scraper.scrape_profile(linkedin_url)
+        # Resolve the model and prepare the PDF renderer while the browser loads the page
+        warm_up()
+        def on_stage(stage):
+            if stage in SCRAPE_PROGRESS:
+                set_progress(session_id, *SCRAPE_PROGRESS[stage])
+        
+        # Sections whose fields are scraped early (e.g. the summary) start generating right away
+        # The scrape's queue, browser checkout and page load all count against the job's deadline
+        profile_data, early_sections = load_profile_early(
+            linkedin_url, job_title, force_refresh, on_stage=on_stage, use_cache=not fresh,
+            timeout=job.remaining() if job else None
+        )
+        timings['scrape'] = time.monotonic() - started_at
         
         if not profile_data:
             return {
@@ -70,63 +268,327 @@ def process_resume(linkedin_url, job_title, session_id):
             }
         
         # Update progress
-        current_progress[session_id]['status'] = 'Generating resume with AI...'
-        current_progress[session_id]['progress'] = 60
+        checkpoint()
+        set_progress(session_id, 'Generating resume with AI...', 60)
+        
+        # Shared AI generator (model choice is resolved once per process)
+        ai_generator = get_resume_generator()
+        # Never wait on the AI past the job's own deadline
+        llm_deadline = float(os.getenv('RESUME_LLM_DEADLINE', '20'))
+        if job:
+            llm_deadline = min(llm_deadline, job.remaining())
+        # The AI text is pushed to progress subscribers as it is written
+        draft = {'text': '', 'live': True}
+        def on_chunk(text):
+            # A stream that outlives the deadline only feeds the upgrade
+            if draft['live']:
+                draft['text'] += text
+                progress_bus.publish(session_id, draft=draft['text'])
         
-        # Initialize AI generator
-        ai_generator = ResumeGenerator()  # Fixed class name
-        resume_data = ai_generator.generate_resume_content(profile_data, job_title)
+        # Serve the fallback resume if the AI is slow; its late result upgrades the session. The AI
+        # slot is held until the call itself ends, not just until the deadline
+        release_llm = get_admission().acquire('llm', timeout=job.remaining() if job else None)
+        try:
+            resume_data, degraded = ai_generator.generate_resume_content_by_deadline(
+                profile_data, job_title, deadline=llm_deadline, use_cache=not fresh, in_flight=early_sections,
+                on_upgrade=lambda result: upgrade_resume(session_id, result, profile_data, after=settled),
+                on_chunk=on_chunk,
+                on_finish=release_llm
+            )
+        except Exception:
+            release_llm()
+            raise
+        draft['live'] = False
+        timings['ai'] = time.monotonic() - started_at - timings['scrape']
         
         # Update progress
-        current_progress[session_id]['status'] = 'Creating PDF...'
-        current_progress[session_id]['progress'] = 80
+        checkpoint()
+        set_progress(session_id, 'Creating PDF...', 80)
         
-        # Generate PDF
-        pdf_generator = PDFResumeGenerator()
-        pdf_path = pdf_generator.create_resume_pdf(resume_data, profile_data)
+        # Generate PDF (kept in memory unless large or persistence is requested) and previews
+        rendered = save_outputs(session_id, resume_data, profile_data)
+        timings['total'] = time.monotonic() - started_at
+        timings['pdf'] = timings['total'] - timings['scrape'] - timings['ai']
+        print("⏱️ Pipeline: " + ', '.join(f"{name}={seconds:.2f}s" for name, seconds in timings.items()))
         
         # Update progress
-        current_progress[session_id]['status'] = 'Complete!'
-        current_progress[session_id]['progress'] = 100
-        current_progress[session_id]['resume_content'] = resume_data['formatted_content']
-        current_progress[session_id]['pdf_path'] = pdf_path
+        update_session(session_id, status='Complete!', progress=100,
+                        resume_content=resume_data['formatted_content'], degraded=degraded,
+                        timings={name: round(seconds, 3) for name, seconds in timings.items()})
         
         return {
             'success': True,
             'resume_content': resume_data['formatted_content'],
-            'pdf_path': pdf_path
+            'pdf_path': rendered['path'],
+            'degraded': degraded
         }
         
+    except JobCancelled as e:
+        update_session(session_id, status=str(e), error=str(e))
+        raise
+    except AdmissionRejected as e:
+        update_session(session_id, status=str(e), error=str(e), retry_after=e.retry_after)
+        return {
+            'success': False,
+            'error': str(e),
+            'retry_after': e.retry_after
+        }
     except Exception as e:
-        current_progress[session_id]['status'] = f'Error: {str(e)}'
-        current_progress[session_id]['error'] = str(e)
+        update_session(session_id, status=f'Error: {str(e)}', error=str(e))
         return {
             'success': False,
             'error': str(e)
         }
+    finally:
+        settled.set()
+
+def save_outputs(session_id, resume_data, profile_data):
+    """Render a session's PDF and previews once and attach them (PDF bytes, or a stored blob once spilled to disk)"""
+    with get_admission().admit('pdf'):
+        rendered = render_pdf(resume_data, profile_data)
+    update_session(
+        session_id,
+        pdf_data=rendered['data'],
+        # Spilled PDFs live in the content-addressed store; the session only keeps the digest
+        pdf_digest=rendered['digest'],
+        pdf_etag=rendered['etag'],
+        pdf_size=rendered['size'],
+        # HTML and text previews, pre-gzipped so repeat views are just a header check
+        previews=render_previews(resume_data, profile_data, session_id)
+    )
+    return rendered
+
+def upgrade_resume(session_id, resume_data, profile_data, after=None):
+    """
+    Replace a session's fallback resume with the AI result that arrived after the deadline
+    
+    Args:
+        after (threading.Event): Set once the job has stored its fallback; the upgrade waits for
+            it so the job's own PDF and final update cannot land on top of the AI result
+    """
+    if after is not None:
+        after.wait()
+    session = sessions.get(session_id)
+    if session is None:
+        return  # expired or evicted while the AI was still working
+    if session.get('error'):
+        return  # the job failed or was cancelled after serving the fallback
+    
+    save_outputs(session_id, resume_data, profile_data)
+    update_session(session_id, resume_content=resume_data['formatted_content'], degraded=False, upgraded=True)
+    print(f"⬆️ Upgraded session {session_id} with the AI resume")
+
+def wait_for_change(session_id, version, state, timeout):
+    """
+    Wait up to timeout for a session's stage to move on, returning (version, state, pushed)
+    
+    The state is always re-read from the session store, which every worker shares. A push
+    from this process ends the wait at once, and pushed holds its fields (e.g. the AI
+    draft); a job running in another worker is followed by polling the store instead.
+    """
+    if progress_bus.version(session_id):
+        update = progress_bus.wait(session_id, version, timeout)
+        if update is None:
+            return progress_bus.version(session_id), sessions.get(session_id), {}
+        return update[0], sessions.get(session_id), update[1]
+    
+    poll = float(os.getenv('PROGRESS_STORE_POLL', '1'))
+    deadline = time.monotonic() + timeout
+    while True:
+        time.sleep(max(0.0, min(poll, deadline - time.monotonic())))
+        current = sessions.get(session_id)
+        if current is None or time.monotonic() >= deadline or \
+                any(current.get(key) != state.get(key) for key in PROGRESS_FIELDS):
+            return version, current, {}
 
 @app.route('/progress/<session_id>')
 def get_progress(session_id):
-    """Get current progress for a session"""
-    progress_data = current_progress.get(session_id, {
-        'status': 'Session not found',
-        'progress': 0,
-        'error': 'Invalid session ID'
-    })
+    """Get current progress for a session; with ?wait=S, long-poll until it changes after version ?since=V"""
+    wait = min(request.args.get('wait', 0, type=float), float(os.getenv('PROGRESS_LONG_POLL_MAX', '30')))
+    version = progress_bus.version(session_id)
+    progress_data = sessions.get(session_id)
+    if progress_data is not None and wait > 0:
+        version, progress_data, _ = wait_for_change(session_id, request.args.get('since', 0, type=int), progress_data, wait)
+    
+    if progress_data is None:
+        return jsonify({
+            'status': 'Session not found',
+            'progress': 0,
+            'error': 'Invalid session ID'
+        })
+    # PDF bytes and previews are blobs served by /download and /preview, not embedded in JSON
+    progress_data['resume_content'] = sessions.get_blob(session_id, 'resume_content', '')
+    progress_data['version'] = version
     return jsonify(progress_data)
 
+@app.route('/progress/<session_id>/events')
+def progress_events(session_id):
+    """Push a session's stage changes and AI text as Server-Sent Events until it completes or fails"""
+    if sessions.get(session_id) is None:
+        return jsonify({'success': False, 'error': 'Invalid session ID'}), 404
+    
+    heartbeat = float(os.getenv('PROGRESS_HEARTBEAT', '15'))
+    
+    def events():
+        version = progress_bus.version(session_id)
+        state = sessions.get(session_id)
+        pushed = {}
+        sent = None
+        draft_sent = 0
+        last_event = time.monotonic()
+        while True:
+            if state is None:
+                yield sse_event('failed', {'error': 'Session expired'})
+                return
+            
+            progress = {'status': state.get('status'), 'progress': state.get('progress', 0)}
+            if progress != sent:
+                yield sse_event('progress', progress)
+                sent = progress
+                last_event = time.monotonic()
+            # Only the text written since the last chunk
+            draft = pushed.get('draft') or ''
+            if len(draft) > draft_sent:
+                yield sse_event('chunk', {'text': draft[draft_sent:]})
+                draft_sent = len(draft)
+                last_event = time.monotonic()
+            if state.get('error'):
+                yield sse_event('failed', {'error': state['error']})
+                return
+            if progress['progress'] >= 100:
+                yield sse_event('complete', {
+                    'session_id': session_id,
+                    'degraded': state.get('degraded', False),
+                    'message': 'Resume generated successfully!'
+                })
+                return
+            if time.monotonic() - last_event >= heartbeat:
+                yield ": keep-alive\n\n"
+                last_event = time.monotonic()
+            
+            version, state, pushed = wait_for_change(session_id, version, state, heartbeat)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/status/<job_id>')
+def get_status(job_id):
+    """Get a job's state together with its session's stage progress"""
+    job = get_job_queue().get(job_id)
+    progress_data = sessions.get(job_id)
+    if job:
+        status = job.to_dict()
+    elif progress_data:
+        # The job runs on another worker; the shared session store still has its progress
+        status = {'job_id': job_id, 'state': session_job_state(progress_data), 'error': progress_data.get('error')}
+    else:
+        return jsonify({'state': 'unknown', 'error': 'Invalid job ID'}), 404
+    
+    progress_data = progress_data or {}
+    status.update({
+        'status': progress_data.get('status'),
+        'progress': progress_data.get('progress', 0),
+        'degraded': progress_data.get('degraded', False),
+        'retry_after': progress_data.get('retry_after')
+    })
+    if status['state'] == 'done':
+        status['resume_content'] = sessions.get_blob(job_id, 'resume_content', '')
+    return jsonify(status)
+
+def session_job_state(session):
+    """Job state as recorded in its session, for jobs held by another worker"""
+    if session.get('job_state'):
+        return session['job_state']
+    if session.get('error'):
+        return 'failed'
+    if session.get('progress', 0) >= 100:
+        return 'done'
+    return 'queued' if session.get('status') == 'Queued' else 'running'
+
+@app.route('/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job; a running job stops at its next stage (only on the worker running it)"""
+    if not get_job_queue().cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job not found or already finished'}), 404
+    update_session(job_id, status='Cancelling...')
+    return jsonify({'success': True, 'job_id': job_id})
+
+@app.route('/sessions/stats')
+def session_stats():
+    """Report session store size, eviction counters and progress push counters"""
+    return jsonify(dict(sessions.get_stats(), progress=progress_bus.get_stats()))
+
+@app.route('/jobs/stats')
+def job_stats():
+    """Report job queue occupancy, outcome counters and how many duplicate requests were coalesced"""
+    return jsonify(dict(get_job_queue().get_stats(), coalescing=in_flight.get_stats()))
+
+@app.route('/admission/stats')
+def admission_stats():
+    """Report per-stage concurrency, queue depth and queue-wait percentiles"""
+    return jsonify(get_admission().get_stats())
+
+@app.route('/pool/stats')
+def pool_stats():
+    """Report browser pool usage"""
+    return jsonify(get_driver_pool().get_stats())
+
+@app.route('/pdf/stats')
+def pdf_stats():
+    """Report PDF worker pool counters (only when PDF_RENDERER=process)"""
+    if os.getenv('PDF_RENDERER', 'inline') != 'process':
+        return jsonify({'renderer': 'inline'})
+    return jsonify(dict(get_pdf_worker_pool().get_stats(), renderer='process'))
+
+@app.route('/output/stats')
+def output_stats():
+    """Report output store usage and dedup/eviction counters"""
+    return jsonify(get_output_store().get_stats())
+
+@app.route('/llm/stats')
+def llm_stats():
+    """Report LLM call, retry, hedging and latency metrics"""
+    return jsonify(get_resume_generator().llm_client.get_stats())
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Report profile/AI response cache counters and prompt token savings"""
+    return jsonify({
+        'profiles': get_profile_cache().get_stats(),
+        'responses': get_resume_generator().response_cache.get_stats(),
+        'prompts': get_resume_generator().prompt_builder.get_stats()
+    })
+
 @app.route('/download/<session_id>')
 def download_resume(session_id):
     """Download generated PDF resume"""
     try:
-        progress_data = current_progress.get(session_id)
-        if not progress_data or 'pdf_path' not in progress_data:
+        progress_data = sessions.get(session_id)
+        if not progress_data or not progress_data.get('pdf_etag'):
             return "Resume not found", 404
         
-        pdf_path = progress_data['pdf_path']
-        if os.path.exists(pdf_path):
-            return send_file(pdf_path, as_attachment=True, download_name='resume.pdf')
+        etag = progress_data['pdf_etag']
+        if etag in request.if_none_match:
+            return Response(status=304, headers={'ETag': f'"{etag}"'})
+        
+        pdf_data = sessions.get_blob(session_id, 'pdf_data')
+        if pdf_data:
+            # Served straight from memory; nothing touches the filesystem
+            return Response(pdf_data, mimetype='application/pdf', headers={
+                'Content-Disposition': 'attachment; filename=resume.pdf',
+                'Content-Length': str(len(pdf_data)),
+                'ETag': f'"{etag}"'
+            })
+        
+        pdf_path = get_output_store().open_blob(progress_data['pdf_digest']) if progress_data.get('pdf_digest') else None
+        if pdf_path:
+            response = send_file(pdf_path, as_attachment=True, download_name='resume.pdf')
+            response.set_etag(etag)
+            return response
         else:
+            # Evicted from the output store (TTL or size cap)
             return "PDF file not found", 404
             
     except Exception as e:
@@ -134,29 +596,32 @@ def download_resume(session_id):
 
 @app.route('/preview/<session_id>')
 def preview_resume(session_id):
-    """Preview resume content"""
+    """Preview resume content as HTML, or as plain text with ?format=text"""
     try:
-        progress_data = current_progress.get(session_id)
-        if not progress_data or 'resume_content' not in progress_data:
+        previews = sessions.get_blob(session_id, 'previews')
+        if not previews:
             return "Resume not found", 404
         
-        resume_content = progress_data['resume_content']
-        # Convert to HTML for better display
-        html_content = resume_content.replace('\n', '<br>')
-        
-        return f"""
-        <html>
-        <head><title>Resume Preview</title></head>
-        <body style="font-family: Arial, sans-serif; margin: 40px; line-height: 1.6;">
-            <h2>Resume Preview</h2>
-            <div style="border: 1px solid #ddd; padding: 20px; background: #f9f9f9;">
-                {html_content}
-            </div>
-            <br>
-            <a href="/download/{session_id}" style="background: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">Download PDF</a>
-        </body>
-        </html>
-        """
+        preview = previews.get(request.args.get('format', 'html'))
+        if not preview:
+            return "Unknown preview format (use html or text)", 400
+        
+        use_gzip = 'gzip' in request.accept_encodings
+        # The gzipped body is a different representation, so it gets its own ETag
+        etag = preview['etag'] + ('-gz' if use_gzip else '')
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': 'private, no-cache',  # Always revalidate; an upgrade can change the resume
+            'Vary': 'Accept-Encoding'
+        }
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+        
+        body = preview['gzip'] if use_gzip else preview['body']
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(body))
+        return Response(body, mimetype=preview['mimetype'], headers=headers)
         
     except Exception as e:
         return f"Error previewing resume: {str(e)}", 500
@@ -0,0 +1,44 @@
+"""Benchmark: per-render PDF style setup, building styles every time vs the shared style set"""
+import io
+import sys
+import timeit
+
+from pdf_generator import PDFResumeGenerator, build_resume_styles, get_resume_styles
+
+
+TEST_RESUME = {
+    'formatted_content': "PROFESSIONAL SUMMARY\nExperienced software engineer.\n\n"
+                         "EXPERIENCE\nSenior Software Engineer - TechCorp\n• Improved performance by 40%",
+    'sections': {}
+}
+TEST_PROFILE = {'name': 'John Doe', 'location': 'San Francisco, CA'}
+
+def per_render_setup():
+    """What every request paid before: a fresh stylesheet plus seven custom styles"""
+    return build_resume_styles()
+
+
+def shared_setup():
+    return PDFResumeGenerator().styles
+
+
+def full_render():
+    PDFResumeGenerator().create_resume_pdf(TEST_RESUME, TEST_PROFILE, output=io.BytesIO())
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    get_resume_styles()  # warm the shared set once, as the first request would
+
+    for name, func in [('build styles per render', per_render_setup),
+                       ('shared style set', shared_setup)]:
+        best = min(timeit.repeat(func, number=runs, repeat=5)) / runs
+        print(f"{name:>24}: {best * 1e6:8.1f} µs per render")
+
+    render_runs = max(1, runs // 20)
+    best = min(timeit.repeat(full_render, number=render_runs, repeat=3)) / render_runs
+    print(f"{'full in-memory render':>24}: {best * 1e3:8.2f} ms per render")
+
+
+if __name__ == "__main__":
+    main()
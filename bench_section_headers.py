@@ -0,0 +1,68 @@
+"""Micro-benchmark: shared section-header classifier vs the old per-line header loops"""
+import random
+import sys
+import timeit
+
+from section_headers import match_header
+
+# Header checks as they were done before section_headers existed
+LEGACY_GENERATOR_HEADERS = [
+    'PROFESSIONAL SUMMARY', 'SUMMARY', 'OBJECTIVE',
+    'CORE COMPETENCIES', 'SKILLS', 'TECHNICAL SKILLS',
+    'PROFESSIONAL EXPERIENCE', 'EXPERIENCE', 'WORK EXPERIENCE',
+    'EDUCATION', 'ACADEMIC BACKGROUND'
+]
+LEGACY_PDF_HEADERS = ['CONTACT', 'PROFESSIONAL', 'EXPERIENCE', 'EDUCATION', 'SKILLS', 'SUMMARY']
+
+CONTENT_LINES = [
+    "• Led a team of 8 engineers delivering a payments platform used by 2M customers",
+    "• Reduced infrastructure costs by 35% by migrating batch jobs to spot instances",
+    "Senior Software Engineer | TechCorp (2019 - Present)",
+    "Experienced engineer with a focus on distributed systems and developer tooling.",
+    "Python, Go, PostgreSQL, Kubernetes, Terraform, AWS",
+    "B.S. Computer Science | Stanford University",
+]
+HEADER_LINES = [
+    "**PROFESSIONAL SUMMARY**", "## Core Competencies", "PROFESSIONAL EXPERIENCE",
+    "Education:", "3. TECHNICAL SKILLS",
+]
+
+
+def build_response(lines):
+    rng = random.Random(42)
+    out = []
+    for i in range(lines):
+        out.append(rng.choice(HEADER_LINES) if i % 25 == 0 else rng.choice(CONTENT_LINES))
+    return '\n'.join(out)
+
+
+def legacy_generator(lines):
+    return sum(1 for line in lines if any(header in line.upper() for header in LEGACY_GENERATOR_HEADERS))
+
+
+def legacy_pdf(lines):
+    return sum(
+        1 for line in lines
+        if (line.isupper() and len(line) > 3) or
+        any(line.upper().startswith(header) for header in LEGACY_PDF_HEADERS)
+    )
+
+
+def shared(lines):
+    return sum(1 for line in lines if match_header(line))
+
+
+def main():
+    total_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    lines = [line.strip() for line in build_response(total_lines).split('\n')]
+
+    print(f"📏 {total_lines} lines, {sum(map(len, lines)) / 1024:.0f} KiB")
+    for name, func in [('legacy generator loop', legacy_generator),
+                       ('legacy PDF loop', legacy_pdf),
+                       ('shared classifier', shared)]:
+        best = min(timeit.repeat(lambda: func(lines), number=1, repeat=5))
+        print(f"{name:>22}: {best * 1000:8.1f} ms  ({func(lines)} headers)")
+
+
+if __name__ == "__main__":
+    main()
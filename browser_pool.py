@@ -0,0 +1,248 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import contextmanager
+import atexit
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # RSS-based recycling is skipped without psutil
+    psutil = None
+
+# ChromeDriverManager().install() hits the network/disk, so resolve it once per process
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_chromedriver_path():
+    """Return the chromedriver path, installing it on first use"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def create_chrome_driver():
+    """Launch a Chrome driver with options to avoid detection"""
+    chrome_options = Options()
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+    # Uncomment the next line to run in headless mode (no browser window)
+    # chrome_options.add_argument("--headless")
+
+    service = Service(get_chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+
+class PooledDriver:
+    """A WebDriver checked out from the pool, with usage bookkeeping"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class WebDriverPool:
+    """Process-wide pool of reusable Chrome sessions"""
+
+    def __init__(self, size=None, max_pages=None, max_rss_mb=None, checkout_timeout=None,
+                 page_load_timeout=None, driver_factory=create_chrome_driver):
+        self.size = size or int(os.getenv('BROWSER_POOL_SIZE', '2'))
+        self.max_pages = max_pages or int(os.getenv('BROWSER_MAX_PAGES', '50'))
+        self.max_rss_mb = max_rss_mb or int(os.getenv('BROWSER_MAX_RSS_MB', '1024'))
+        self.checkout_timeout = checkout_timeout or float(os.getenv('BROWSER_CHECKOUT_TIMEOUT', '60'))
+        # Selenium's default page load timeout is 300s; a hung profile page must not hold a browser that long
+        self.page_load_timeout = page_load_timeout or float(os.getenv('BROWSER_PAGE_LOAD_TIMEOUT', '30'))
+        self.driver_factory = driver_factory
+
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            'created': 0,
+            'reused': 0,
+            'recycled': 0,
+            'unhealthy': 0,
+        }
+
+    def checkout(self, timeout=None, page_load_timeout=None):
+        """
+        Borrow a healthy driver, launching a new one if the pool has room
+
+        timeout shortens the wait for a free browser, page_load_timeout the pool's page load
+        timeout for this checkout (e.g. to what is left of a job's deadline).
+        """
+        timeout = self.checkout_timeout if timeout is None else min(self.checkout_timeout, timeout)
+        if page_load_timeout is None:
+            page_load_timeout = self.page_load_timeout
+        else:
+            page_load_timeout = min(self.page_load_timeout, page_load_timeout)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("WebDriver pool is closed")
+
+                pooled = None
+                if self._idle:
+                    pooled = self._idle.pop()
+                elif self._total < self.size:
+                    self._total += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No browser available after {timeout:.1f}s")
+                    self._cond.wait(remaining)
+                    continue
+
+            if pooled is None:
+                try:
+                    pooled = PooledDriver(self.driver_factory())
+                except Exception:
+                    self._release_slot()
+                    raise
+                self.stats['created'] += 1
+            elif self.is_healthy(pooled):
+                self.stats['reused'] += 1
+            else:
+                print("♻️ Discarding unhealthy browser")
+                self.stats['unhealthy'] += 1
+                self._destroy(pooled)
+                continue
+
+            # Set on every checkout, since the previous borrower may have shortened it
+            try:
+                pooled.driver.set_page_load_timeout(page_load_timeout)
+            except Exception:
+                self._destroy(pooled)
+                raise
+            return pooled
+
+    def checkin(self, pooled, healthy=True):
+        """Return a driver to the pool, recycling it if it is worn out"""
+        pooled.pages += 1
+
+        if healthy:
+            try:
+                # Drop the profile page so the idle browser does not hold its DOM
+                pooled.driver.get('about:blank')
+            except Exception:
+                healthy = False
+
+        if not healthy:
+            self.stats['unhealthy'] += 1
+            self._destroy(pooled)
+            return
+
+        if pooled.pages >= self.max_pages or self.rss_mb(pooled) > self.max_rss_mb:
+            print(f"♻️ Recycling browser after {pooled.pages} pages")
+            self.stats['recycled'] += 1
+            self._destroy(pooled)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._total -= 1
+                closed = True
+            else:
+                self._idle.append(pooled)
+                self._cond.notify()
+                closed = False
+        if closed:
+            self._quit(pooled)
+
+    @contextmanager
+    def driver(self, timeout=None, page_load_timeout=None):
+        """Check out a driver for the duration of a with-block"""
+        pooled = self.checkout(timeout, page_load_timeout)
+        healthy = True
+        try:
+            yield pooled.driver
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.checkin(pooled, healthy=healthy)
+
+    def is_healthy(self, pooled):
+        """Check that the browser still answers WebDriver commands"""
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def rss_mb(self, pooled):
+        """Resident memory of the chromedriver process tree in MB"""
+        if psutil is None:
+            return 0
+        try:
+            process = psutil.Process(pooled.driver.service.process.pid)
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            return rss / (1024 * 1024)
+        except Exception:
+            return 0
+
+    def get_stats(self):
+        """Return pool counters for monitoring"""
+        with self._cond:
+            return dict(self.stats, size=self.size, total=self._total, idle=len(self._idle))
+
+    def close(self):
+        """Quit every idle browser and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+    def _destroy(self, pooled):
+        self._quit(pooled)
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"Error closing browser: {e}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Return the process-wide WebDriver pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WebDriverPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,187 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+import threading
+import time
+import uuid
+
+
+class JobQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job at its next checkpoint once it is cancelled or past its deadline"""
+
+
+class Job:
+    """One queued unit of work, with cooperative cancellation and a deadline"""
+
+    def __init__(self, job_id, deadline):
+        self.id = job_id
+        self.state = 'queued'  # queued -> running -> done | failed | cancelled | expired
+        self.result = None
+        self.error = None
+        self.deadline = deadline
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._started = time.monotonic()
+        self._cancel = threading.Event()
+
+    def remaining(self):
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.deadline - (time.monotonic() - self._started))
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        """Stage checkpoint: stop the job if it was cancelled or ran out of time"""
+        if self._cancel.is_set():
+            raise JobCancelled("Job cancelled")
+        if not self.remaining():
+            raise JobCancelled(f"Job exceeded its {self.deadline:.0f}s deadline")
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'state': self.state,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'remaining': round(self.remaining(), 1) if self.state in ('queued', 'running') else None
+        }
+
+
+class JobQueue:
+    """Bounded worker pool that runs jobs in the background and tracks their state"""
+
+    def __init__(self, workers=None, queue_depth=None, deadline=None, max_jobs=None):
+        self.workers = workers or int(os.getenv('JOB_WORKERS', '4'))
+        self.queue_depth = queue_depth if queue_depth is not None else int(os.getenv('JOB_QUEUE_DEPTH', '32'))
+        self.deadline = deadline or float(os.getenv('JOB_DEADLINE', '120'))
+        # Finished jobs are forgotten oldest-first beyond this many
+        self.max_jobs = max_jobs or int(os.getenv('JOB_HISTORY', '1000'))
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        # Running plus waiting jobs; anything beyond is rejected rather than queued forever
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'expired': 0,
+            'queue_seconds': 0.0,
+            'run_seconds': 0.0,
+        }
+
+    def submit(self, func, *args, job_id=None, deadline=None, on_finish=None, **kwargs):
+        """Queue func(*args, job=job, **kwargs) and return its Job immediately
+
+        on_finish(job) is called once the job ends in any state, including a
+        cancellation that happened while it was still queued.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise JobQueueFull("Job queue is full")
+
+        job = Job(job_id or str(uuid.uuid4()), deadline or self.deadline)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+            self.stats['submitted'] += 1
+        job.future = self.executor.submit(self._run, job, func, args, kwargs, on_finish)
+        return job
+
+    def _run(self, job, func, args, kwargs, on_finish):
+        job.started_at = time.time()
+        self._count('queue_seconds', job.started_at - job.submitted_at)
+        try:
+            job.check()  # it may have been cancelled or expired while waiting
+            job.state = 'running'
+            job.result = func(*args, job=job, **kwargs)
+            job.state = 'done'
+            self._count('completed')
+        except JobCancelled as e:
+            job.state = 'cancelled' if job._cancel.is_set() else 'expired'
+            job.error = str(e)
+            self._count(job.state)
+        except Exception as e:
+            job.state = 'failed'
+            job.error = str(e)
+            self._count('failed')
+        finally:
+            job.finished_at = time.time()
+            self._count('run_seconds', job.finished_at - job.started_at)
+            self._slots.release()
+            if on_finish:
+                try:
+                    on_finish(job)
+                except Exception as e:
+                    print(f"Error in job {job.id} finish callback: {str(e)}")
+        return job.result
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a job; a queued job never starts, a running one stops at its next stage"""
+        job = self.get(job_id)
+        if not job or job.state not in ('queued', 'running'):
+            return False
+        job.cancel()
+        return True
+
+    def retry_after(self):
+        """Seconds a rejected client should wait: roughly the time to drain the current queue"""
+        with self._lock:
+            finished = sum(self.stats[state] for state in ('completed', 'failed', 'cancelled', 'expired'))
+            average = self.stats['run_seconds'] / finished if finished else self.deadline / 4
+            queued = sum(1 for job in self._jobs.values() if job.state == 'queued')
+        return max(1, math.ceil(average * (queued + 1) / self.workers))
+
+    def _trim(self):
+        # Only finished jobs are dropped; live ones are bounded by the slots
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].finished_at:
+                del self._jobs[job_id]
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def get_stats(self):
+        """Return job counters plus current queue occupancy"""
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+            return dict(
+                self.stats,
+                queued=states.count('queued'),
+                running=states.count('running'),
+                workers=self.workers,
+                queue_depth=self.queue_depth
+            )
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -1,92 +1,208 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
+import os
 import time
 import json
-from bs4 import BeautifulSoup
+from browser_pool import create_chrome_driver
+from profile_parser import (
+    parse_profile_html, parse_profile_header, NAME_SELECTORS, HEADLINE_SELECTORS, LOCATION_SELECTORS,
+    ABOUT_SELECTORS, EXPERIENCE_SELECTORS, EDUCATION_SELECTORS, SKILL_SELECTORS
+)
+
+# Elements whose presence means a profile section has rendered
+SECTION_READY_SELECTORS = {
+    'top_card': ["h1.text-heading-xlarge", ".pv-text-details__left-panel h1", ".ph5 h1"],
+    'experience': ["#experience", ".experience-section", ".pvs-list__paged-list-item"],
+    'education': ["#education", ".education-section"],
+    'skills': ["#skills", ".pv-skill-category-entity__name-text", ".skill-category-entity__name"],
+}
 
 class LinkedInScraper:
-    def __init__(self):
-        self.driver = None
-        self.setup_driver()
+    def __init__(self, driver=None, wait_budget=None, section_timeout=None, extraction_mode=None):
+        """Use the given driver (e.g. from the browser pool) or launch our own"""
+        self.driver = driver
+        self.owns_driver = driver is None
+        # 'snapshot' parses one page_source copy in-process, 'live' queries the browser per field
+        self.extraction_mode = extraction_mode or os.getenv('SCRAPE_EXTRACTION_MODE', 'snapshot')
+        # Total seconds a single profile may spend waiting on the page
+        self.wait_budget = wait_budget or float(os.getenv('SCRAPE_WAIT_BUDGET', '12'))
+        # Upper bound for any single section wait
+        self.section_timeout = section_timeout or float(os.getenv('SCRAPE_SECTION_TIMEOUT', '5'))
+        self.wait_timings = {}
+        self._wait_deadline = None
+        if self.owns_driver:
+            self.setup_driver()
     
     def setup_driver(self):
         """Set up Chrome driver with options to avoid detection"""
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        
-        # Uncomment the next line to run in headless mode (no browser window)
-        # chrome_options.add_argument("--headless")
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        self.driver = create_chrome_driver()
     
     def scrape_profile(self, linkedin_url):
         """Scrape LinkedIn profile and return structured data"""
         try:
-            print(f"Navigating to: {linkedin_url}")
-            self.driver.get(linkedin_url)
-            
-            # Wait for page to load
-            time.sleep(5)
-            
-            # Initialize profile data
-            profile_data = {
-                'name': '',
-                'headline': '',
-                'location': '',
-                'about': '',
-                'experience': [],
-                'education': [],
-                'skills': [],
-                'url': linkedin_url
-            }
-            
-            # Extract basic information
-            profile_data['name'] = self.extract_name()
-            profile_data['headline'] = self.extract_headline()
-            profile_data['location'] = self.extract_location()
-            profile_data['about'] = self.extract_about()
-            
-            # Scroll to load more content
-            self.scroll_page()
-            
-            # Extract experience
-            profile_data['experience'] = self.extract_experience()
-            
-            # Extract education
-            profile_data['education'] = self.extract_education()
-            
-            # Extract skills
-            profile_data['skills'] = self.extract_skills()
-            
+            profile_data = None
+            for _, profile_data in self.scrape_profile_stages(linkedin_url):
+                pass
             return profile_data
             
         except Exception as e:
             print(f"Error scraping profile: {e}")
             return None
     
+    def scrape_profile_stages(self, linkedin_url, early_header=False):
+        """
+        Scrape a profile, yielding (stage, profile_data) as each part is extracted
+        
+        Stages are 'header' (name, headline, location, about), then 'experience',
+        'education' and 'skills' in live mode, and always 'complete' last with the
+        full profile. Snapshot mode yields 'header' only with early_header, since it
+        costs a second page_source copy and parse. Errors propagate to the caller.
+        """
+        print(f"Navigating to: {linkedin_url}")
+        self.wait_timings = {}
+        self._wait_deadline = time.monotonic() + self.wait_budget
+        self.driver.get(linkedin_url)
+        
+        # Wait for the top card instead of a fixed sleep
+        self.wait_for_section('top_card')
+        
+        if self.extraction_mode == 'snapshot':
+            yield from self.extract_from_snapshot(linkedin_url, early_header)
+        else:
+            yield from self.extract_live(linkedin_url)
+        
+        total_wait = sum(self.wait_timings.values())
+        print(f"⏱️ Waited {total_wait:.2f}s on page readiness: {self.format_wait_timings()}")
+    
+    def extract_live(self, linkedin_url):
+        """Extract each field with its own WebDriver queries, yielding after each section"""
+        # Initialize profile data
+        profile_data = {
+            'name': '',
+            'headline': '',
+            'location': '',
+            'about': '',
+            'experience': [],
+            'education': [],
+            'skills': [],
+            'url': linkedin_url
+        }
+        
+        # Extract basic information
+        profile_data['name'] = self.extract_name()
+        profile_data['headline'] = self.extract_headline()
+        profile_data['location'] = self.extract_location()
+        profile_data['about'] = self.extract_about()
+        yield 'header', dict(profile_data)
+        
+        # Scroll to load more content
+        self.scroll_page()
+        
+        # Extract experience
+        self.wait_for_section('experience', quiet_period=0.5)
+        profile_data['experience'] = self.extract_experience()
+        yield 'experience', dict(profile_data)
+        
+        # Extract education
+        self.wait_for_section('education', quiet_period=0.5)
+        profile_data['education'] = self.extract_education()
+        yield 'education', dict(profile_data)
+        
+        # Extract skills
+        self.wait_for_section('skills', quiet_period=0.5)
+        profile_data['skills'] = self.extract_skills()
+        yield 'complete', profile_data
+    
+    def extract_from_snapshot(self, linkedin_url, early_header=False):
+        """Load every section, then parse one full snapshot offline (plus the header as soon as it renders, if asked)"""
+        if early_header:
+            yield 'header', parse_profile_header(self.driver.page_source, linkedin_url)
+        
+        self.scroll_page()
+        for section in ('experience', 'education', 'skills'):
+            self.wait_for_section(section, quiet_period=0.5)
+        
+        profile_data = parse_profile_html(self.driver.page_source, linkedin_url)
+        print(f"Parsed snapshot: {len(profile_data['experience'])} experience, "
+              f"{len(profile_data['education'])} education, {len(profile_data['skills'])} skills")
+        yield 'complete', profile_data
+    
+    def remaining_wait_budget(self):
+        """Seconds left in this profile's wait budget"""
+        if self._wait_deadline is None:
+            return self.section_timeout
+        return max(0.0, self._wait_deadline - time.monotonic())
+    
+    def wait_for_section(self, section, timeout=None, quiet_period=None):
+        """
+        Wait until any selector for the section is present, within the budget
+        
+        With quiet_period, also stop once the page has not changed for that long: a section
+        still missing from a settled page is absent (e.g. a profile without education).
+        """
+        selectors = SECTION_READY_SELECTORS[section]
+        timeout = min(timeout or self.section_timeout, self.remaining_wait_budget())
+        start = time.monotonic()
+        settled = self.dom_settled(quiet_period) if quiet_period else None
+        found = False
+        
+        def ready(driver):
+            if any(driver.find_elements(By.CSS_SELECTOR, selector) for selector in selectors):
+                return 'found'
+            return 'settled' if settled and settled(driver) else False
+        
+        if timeout > 0:
+            try:
+                found = WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(ready) == 'found'
+                if not found:
+                    print(f"Section '{section}' absent, page settled after {time.monotonic() - start:.1f}s")
+            except TimeoutException:
+                print(f"Section '{section}' not ready after {timeout:.1f}s")
+        
+        self.wait_timings[section] = time.monotonic() - start
+        return found
+    
+    def wait_for_dom_stable(self, label, quiet_period=0.5, timeout=None):
+        """Wait until the page stops growing (e.g. after a scroll triggers lazy loading)"""
+        timeout = min(timeout or self.section_timeout, self.remaining_wait_budget())
+        start = time.monotonic()
+        
+        stable = False
+        if timeout > 0:
+            try:
+                WebDriverWait(self.driver, timeout, poll_frequency=0.15).until(self.dom_settled(quiet_period))
+                stable = True
+            except TimeoutException:
+                print(f"Page still changing after {timeout:.1f}s ({label})")
+        
+        self.wait_timings[label] = self.wait_timings.get(label, 0.0) + (time.monotonic() - start)
+        return stable
+    
+    def dom_settled(self, quiet_period):
+        """Return a wait condition that is true once the page size has not changed for quiet_period"""
+        state = {'size': None, 'since': time.monotonic()}
+        
+        def settled(driver):
+            size = driver.execute_script("return document.body ? document.body.innerHTML.length : 0")
+            now = time.monotonic()
+            if size != state['size']:
+                state['size'] = size
+                state['since'] = now
+                return False
+            return now - state['since'] >= quiet_period
+        
+        return settled
+    
+    def format_wait_timings(self):
+        """Render recorded wait timings as 'section=1.23s' pairs"""
+        return ', '.join(f"{name}={seconds:.2f}s" for name, seconds in self.wait_timings.items())
+    
     def extract_name(self):
         """Extract user's name"""
         try:
-            name_selectors = [
-                "h1.text-heading-xlarge",
-                "h1",
-                ".pv-text-details__left-panel h1",
-                ".ph5 h1"
-            ]
-            
-            for selector in name_selectors:
+            for selector in NAME_SELECTORS:
                 try:
                     element = self.driver.find_element(By.CSS_SELECTOR, selector)
                     name = element.text.strip()
@@ -104,13 +220,7 @@ class LinkedInScraper:
     def extract_headline(self):
         """Extract user's headline/title"""
         try:
-            headline_selectors = [
-                ".text-body-medium.break-words",
-                ".pv-text-details__left-panel .text-body-medium",
-                ".ph5 .text-body-medium"
-            ]
-            
-            for selector in headline_selectors:
+            for selector in HEADLINE_SELECTORS:
                 try:
                     element = self.driver.find_element(By.CSS_SELECTOR, selector)
                     headline = element.text.strip()
@@ -128,13 +238,7 @@ class LinkedInScraper:
     def extract_location(self):
         """Extract user's location"""
         try:
-            location_selectors = [
-                ".text-body-small.inline.t-black--light.break-words",
-                ".pv-text-details__left-panel .text-body-small",
-                ".ph5 .text-body-small"
-            ]
-            
-            for selector in location_selectors:
+            for selector in LOCATION_SELECTORS:
                 try:
                     element = self.driver.find_element(By.CSS_SELECTOR, selector)
                     location = element.text.strip()
@@ -152,13 +256,7 @@ class LinkedInScraper:
     def extract_about(self):
         """Extract about section"""
         try:
-            about_selectors = [
-                ".pv-shared-text-with-see-more .full-width",
-                ".display-flex.ph5 .pv-shared-text-with-see-more",
-                ".artdeco-card .pv-shared-text-with-see-more"
-            ]
-            
-            for selector in about_selectors:
+            for selector in ABOUT_SELECTORS:
                 try:
                     element = self.driver.find_element(By.CSS_SELECTOR, selector)
                     about = element.text.strip()
@@ -178,9 +276,9 @@ class LinkedInScraper:
         try:
             # Scroll down to load experience and education sections
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(2)
+            self.wait_for_dom_stable('scroll')
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
+            self.wait_for_dom_stable('scroll')
         except Exception as e:
             print(f"Error scrolling: {e}")
     
@@ -189,14 +287,7 @@ class LinkedInScraper:
         try:
             experiences = []
             
-            # Try different selectors for experience section
-            experience_selectors = [
-                ".pvs-list__paged-list-item",
-                ".experience-section .pv-entity__summary-info",
-                ".pv-profile-section__card-item-v2"
-            ]
-            
-            for selector in experience_selectors:
+            for selector in EXPERIENCE_SELECTORS:
                 try:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if elements:
@@ -220,13 +311,7 @@ class LinkedInScraper:
         try:
             education = []
             
-            education_selectors = [
-                ".education-section .pv-entity__summary-info",
-                ".pvs-list__paged-list-item .pvs-entity",
-                ".pv-profile-section__card-item-v2"
-            ]
-            
-            for selector in education_selectors:
+            for selector in EDUCATION_SELECTORS:
                 try:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if elements:
@@ -250,14 +335,7 @@ class LinkedInScraper:
         try:
             skills = []
             
-            # Try to find skills section
-            skill_selectors = [
-                ".pv-skill-category-entity__name-text",
-                ".pvs-list__paged-list-item .mr1",
-                ".skill-category-entity__name"
-            ]
-            
-            for selector in skill_selectors:
+            for selector in SKILL_SELECTORS:
                 try:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if elements:
@@ -277,9 +355,10 @@ class LinkedInScraper:
             return ["Skills information not available"]
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
+        """Close the browser if this scraper launched it"""
+        if self.driver and self.owns_driver:
             self.driver.quit()
+        self.driver = None
     
     def __del__(self):
         """Cleanup when object is destroyed"""
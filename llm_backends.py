@@ -0,0 +1,229 @@
+from types import SimpleNamespace
+import json
+import os
+import random
+import re
+import threading
+import time
+
+try:
+    from google.api_core.exceptions import ServiceUnavailable as InjectedError
+except ImportError:
+    InjectedError = ConnectionError
+
+
+class LLMBackend:
+    """Source of model objects exposing generate_content(prompt, **kwargs)"""
+
+    name = None
+    model_names = []
+
+    def get_model(self, model_name):
+        raise NotImplementedError
+
+    def probe(self, model_name):
+        """Make a cheap test call; raise if the model is unusable or does not answer in time"""
+        timeout = float(os.getenv('LLM_PROBE_TIMEOUT', '10'))
+        self.get_model(model_name).generate_content("Hello", request_options={'timeout': timeout})
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google.generativeai"""
+
+    name = 'gemini'
+    # Candidate model names (most likely working ones first)
+    model_names = [
+        'gemini-1.5-flash',
+        'gemini-1.5-pro',
+        'models/gemini-1.5-flash',
+        'models/gemini-1.5-pro'
+    ]
+
+    def __init__(self):
+        # Imported here so the fake backend runs without the Gemini SDK installed
+        import google.generativeai as genai
+
+        api_key = os.getenv('GOOGLE_API_KEY')
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY not found in environment variables")
+
+        genai.configure(api_key=api_key)
+        self.genai = genai
+
+    def get_model(self, model_name):
+        return self.genai.GenerativeModel(model_name)
+
+
+CANNED_SECTIONS = {
+    'PROFESSIONAL SUMMARY': (
+        "Results-driven professional with a track record of shipping reliable software "
+        "and leading cross-functional teams. Known for turning ambiguous problems into "
+        "measurable business outcomes."
+    ),
+    'CORE COMPETENCIES': (
+        "• Software Architecture\n• Team Leadership\n• Cloud Infrastructure\n"
+        "• Data-Driven Decision Making\n• Stakeholder Communication"
+    ),
+    'PROFESSIONAL EXPERIENCE': (
+        "Senior Software Engineer | Example Corp (2020 - Present)\n"
+        "• Led a team of 6 engineers delivering a platform used by 1M+ customers\n"
+        "• Cut infrastructure costs by 30% through workload right-sizing\n\n"
+        "Software Engineer | Sample Inc (2017 - 2020)\n"
+        "• Built REST APIs handling 5K requests per second\n"
+        "• Reduced release cycle from monthly to weekly with CI/CD automation"
+    ),
+    'EDUCATION': "B.S. Computer Science | State University",
+    'TECHNICAL SKILLS': "Python, JavaScript, SQL, Docker, Kubernetes, AWS, Git",
+}
+
+CANNED_DOCUMENT = {
+    'summary': CANNED_SECTIONS['PROFESSIONAL SUMMARY'],
+    'competencies': ['Software Architecture', 'Team Leadership', 'Cloud Infrastructure'],
+    'experience': [
+        {
+            'title': 'Senior Software Engineer',
+            'company': 'Example Corp',
+            'dates': '2020 - Present',
+            'bullets': [
+                'Led a team of 6 engineers delivering a platform used by 1M+ customers',
+                'Cut infrastructure costs by 30% through workload right-sizing',
+            ],
+        },
+    ],
+    'education': [{'degree': 'B.S. Computer Science', 'school': 'State University', 'dates': ''}],
+    'technical_skills': ['Python', 'JavaScript', 'SQL', 'Docker', 'Kubernetes', 'AWS'],
+}
+
+
+def parse_latency(spec):
+    """Build a latency sampler from 'fixed:S', 'uniform:LO,HI', 'normal:MU,SIGMA' or 'lognormal:MU,SIGMA'"""
+    kind, _, args = spec.partition(':')
+    values = [float(value) for value in args.split(',') if value.strip()]
+
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == 'lognormal':
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class FakeModel:
+    """Deterministic stand-in for a GenerativeModel returning canned resumes"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def generate_content(self, prompt, stream=False, generation_config=None, request_options=None):
+        latency = self.backend.sample_latency()
+        timeout = (request_options or {}).get('timeout')
+
+        if self.backend.should_fail(self.backend.timeout_rate):
+            # Simulate a hung request that only ends when the client deadline fires
+            time.sleep(timeout if timeout else latency)
+            raise TimeoutError("Injected LLM timeout")
+        if self.backend.should_fail(self.backend.error_rate):
+            time.sleep(latency * 0.1)
+            raise InjectedError("Injected LLM error")
+
+        text = self.canned_response(prompt, generation_config)
+        self.backend.count_call()
+
+        if stream:
+            return self.stream_chunks(text, latency)
+
+        time.sleep(latency)
+        return SimpleNamespace(text=text)
+
+    def stream_chunks(self, text, latency):
+        size = self.backend.chunk_chars
+        chunks = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+        # Time to first chunk is a fifth of the latency; the rest is spread over the stream
+        time.sleep(latency * 0.2)
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(latency * 0.8 / len(chunks))
+            yield SimpleNamespace(text=chunk)
+
+    def count_tokens(self, text):
+        return SimpleNamespace(total_tokens=(len(text) + 3) // 4)
+
+    def canned_response(self, prompt, generation_config=None):
+        if generation_config and generation_config.get('response_mime_type') == 'application/json':
+            return json.dumps(CANNED_DOCUMENT)
+
+        section = re.search(r"Write only the ([A-Z ]+) section", prompt)
+        if section and section.group(1) in CANNED_SECTIONS:
+            return CANNED_SECTIONS[section.group(1)]
+
+        if prompt == "Hello":
+            return "Hello!"
+
+        name = re.search(r"Name: (.+)", prompt)
+        lines = [name.group(1).strip() if name else 'Candidate Name', '']
+        for title, content in CANNED_SECTIONS.items():
+            lines.extend([title, content, ''])
+        return '\n'.join(lines).strip()
+
+
+class FakeBackend(LLMBackend):
+    """Offline backend for load tests: canned output, configurable latency, streaming and errors"""
+
+    name = 'fake'
+    model_names = ['fake-resume-model']
+
+    def __init__(self, latency=None, error_rate=None, timeout_rate=None, chunk_chars=None, seed=None):
+        self.latency = parse_latency(latency or os.getenv('FAKE_LLM_LATENCY', 'lognormal:0.0,0.4'))
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv('FAKE_LLM_ERROR_RATE', '0'))
+        self.timeout_rate = timeout_rate if timeout_rate is not None else float(os.getenv('FAKE_LLM_TIMEOUT_RATE', '0'))
+        self.chunk_chars = chunk_chars or int(os.getenv('FAKE_LLM_CHUNK_CHARS', '40'))
+        seed = seed if seed is not None else int(os.getenv('FAKE_LLM_SEED', '1234'))
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def get_model(self, model_name):
+        return FakeModel(self)
+
+    def probe(self, model_name):
+        # Probing must not consume latency samples or injected failures
+        return None
+
+    def sample_latency(self):
+        with self._lock:
+            return self.latency(self._rng)
+
+    def should_fail(self, rate):
+        if not rate:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def count_call(self):
+        with self._lock:
+            self.calls += 1
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': FakeBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_llm_backend():
+    """Return the process-wide backend selected by LLM_BACKEND (default: gemini)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.getenv('LLM_BACKEND', 'gemini')
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown LLM_BACKEND '{name}' (expected one of {', '.join(BACKENDS)})")
+            _backend = BACKENDS[name]()
+        return _backend
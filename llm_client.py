@@ -0,0 +1,257 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import asyncio
+import os
+import random
+import threading
+import time
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    RETRYABLE_ERRORS = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+except ImportError:  # google-api-core ships with google-generativeai, but stay importable without it
+    RETRYABLE_ERRORS = ()
+
+# Marks the end of a streamed response
+_END = object()
+
+
+class TokenBucket:
+    """Process-wide rate limiter: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def is_retryable(error):
+    """Throttling, transient server errors and timeouts are worth retrying"""
+    return isinstance(error, RETRYABLE_ERRORS + (TimeoutError, asyncio.TimeoutError, ConnectionError))
+
+
+class LLMClient:
+    """Calls model.generate_content with deadlines, retries, optional hedging and rate limiting"""
+
+    def __init__(self, timeout=None, max_retries=None, backoff_base=None, backoff_max=None,
+                 hedge=None, hedge_after=None, limiter=None, max_workers=None):
+        self.timeout = timeout or float(os.getenv('LLM_TIMEOUT', '60'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('LLM_MAX_RETRIES', '3'))
+        self.backoff_base = backoff_base or float(os.getenv('LLM_BACKOFF_BASE', '0.5'))
+        self.backoff_max = backoff_max or float(os.getenv('LLM_BACKOFF_MAX', '8'))
+        self.hedge = hedge if hedge is not None else os.getenv('LLM_HEDGE', '0') == '1'
+        # Fixed hedge delay in seconds; when unset, hedge after the observed p95 latency
+        self.hedge_after = hedge_after or (float(os.getenv('LLM_HEDGE_AFTER')) if os.getenv('LLM_HEDGE_AFTER') else None)
+        self.limiter = limiter or TokenBucket(
+            rate=float(os.getenv('LLM_RATE_LIMIT_RPM', '60')) / 60,
+            capacity=float(os.getenv('LLM_RATE_LIMIT_BURST', '5'))
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('LLM_MAX_WORKERS', '8')),
+            thread_name_prefix='llm'
+        )
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=500)
+        # Time to first chunk of streamed calls, kept apart so it does not skew the hedge delay
+        self._stream_latencies = deque(maxlen=500)
+        self.stats = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'retries': 0,
+            'timeouts': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'throttle_wait_seconds': 0.0,
+        }
+
+    def generate(self, model, prompt, **kwargs):
+        """Blocking call for synchronous callers (e.g. Flask request threads)"""
+        return asyncio.run(self.generate_async(model, prompt, **kwargs))
+
+    async def generate_async(self, model, prompt, timeout=None, **kwargs):
+        """
+        Call model.generate_content with a deadline, retrying retryable errors with jittered backoff
+        
+        A streamed call returns an iterator of chunks once the first one arrives; the deadline
+        also covers reading the rest, which fails with TimeoutError when it runs out.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        stream = kwargs.get('stream')
+        # A streamed response is consumed by one caller, so never duplicate it
+        hedge = self.hedge and not stream
+        self._count('calls')
+
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise TimeoutError("LLM call deadline exceeded")
+
+                waited = await self.limiter.acquire_async()
+                self._count('throttle_wait_seconds', waited)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("LLM call deadline exceeded while throttled")
+
+                started = time.monotonic()
+                response = await asyncio.wait_for(
+                    self._call(model, prompt, kwargs, remaining, hedge), timeout=remaining
+                )
+                if stream:
+                    # The call only returns a lazy iterator; errors before the first chunk are still retried
+                    chunks = iter(response)
+                    first = await asyncio.wait_for(
+                        asyncio.get_running_loop().run_in_executor(self.executor, next, chunks, _END),
+                        timeout=deadline - time.monotonic()
+                    )
+                    self._record_latency(time.monotonic() - started, self._stream_latencies)
+                    return self._stream(chunks, first, deadline)
+
+                self._record_latency(time.monotonic() - started)
+                self._count('successes')
+                return response
+
+            except Exception as e:
+                if isinstance(e, (TimeoutError, asyncio.TimeoutError)):
+                    self._count('timeouts')
+
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                if not is_retryable(e) or attempt >= self.max_retries or \
+                        time.monotonic() + backoff >= deadline:
+                    self._count('failures')
+                    raise
+
+                attempt += 1
+                self._count('retries')
+                print(f"🔁 LLM call failed ({type(e).__name__}), retry {attempt} in {backoff:.2f}s")
+                await asyncio.sleep(backoff)
+
+    def _stream(self, chunks, first, deadline):
+        """Yield the chunks of a streamed response, raising TimeoutError once the deadline passes"""
+        chunk = first
+        try:
+            while chunk is not _END:
+                yield chunk
+                try:
+                    chunk = self.executor.submit(next, chunks, _END).result(timeout=deadline - time.monotonic())
+                except FutureTimeoutError:
+                    raise TimeoutError("LLM stream deadline exceeded") from None
+        except Exception as e:
+            if isinstance(e, TimeoutError):
+                self._count('timeouts')
+            self._count('failures')
+            raise
+        self._count('successes')
+
+    async def _call(self, model, prompt, kwargs, remaining, hedge):
+        loop = asyncio.get_running_loop()
+
+        def call():
+            # Pass the deadline down so the HTTP request itself gives up too
+            return model.generate_content(prompt, request_options={'timeout': remaining}, **kwargs)
+
+        primary = loop.run_in_executor(self.executor, call)
+        hedge_delay = self.hedge_delay() if hedge else None
+        if hedge_delay is None or hedge_delay >= remaining:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        # The primary is slower than usual; race a duplicate request against it
+        self._count('hedges')
+        await self.limiter.acquire_async()
+        secondary = loop.run_in_executor(self.executor, call)
+        pending = {primary, secondary}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None when there is no basis yet"""
+        if self.hedge_after:
+            return self.hedge_after
+        return self.percentile(95) if len(self._latencies) >= 20 else None
+
+    def percentile(self, pct, series=None):
+        with self._lock:
+            samples = sorted(self._latencies if series is None else series)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def _record_latency(self, seconds, series=None):
+        with self._lock:
+            (self._latencies if series is None else series).append(seconds)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def get_stats(self):
+        """Return call counters and latency percentiles"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['latency_p50'] = self.percentile(50)
+        stats['latency_p95'] = self.percentile(95)
+        stats['stream_first_chunk_p50'] = self.percentile(50, self._stream_latencies)
+        stats['stream_first_chunk_p95'] = self.percentile(95, self._stream_latencies)
+        stats['hedge_delay'] = self.hedge_delay() if self.hedge else None
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide LLM client (shares one rate limiter and executor)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
@@ -0,0 +1,97 @@
+"""Offline end-to-end load test of app.py using the fake LLM backend.
+
+Profiles are pre-seeded into the profile cache so no browser is launched,
+and every request asks for fresh AI output so the fake backend is exercised.
+Each request uses its own job title, so none is coalesced onto another's job.
+
+    python load_test.py --requests 200 --concurrency 16
+    FAKE_LLM_LATENCY=uniform:0.5,2 FAKE_LLM_ERROR_RATE=0.05 python load_test.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import tempfile
+import time
+
+# Must be set before app (and the backend singleton) are imported
+os.environ.setdefault('LLM_BACKEND', 'fake')
+os.environ.setdefault('PROFILE_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'profiles.sqlite3'))
+os.environ.setdefault('LLM_RATE_LIMIT_RPM', '100000')
+os.environ.setdefault('LLM_RATE_LIMIT_BURST', '1000')
+
+from app import app
+from ai_resume_generator import get_resume_generator
+from profile_cache import get_profile_cache
+from job_queue import get_job_queue
+
+TEST_PROFILE = {
+    'name': 'Load Test User',
+    'headline': 'Senior Software Engineer at Example Corp',
+    'location': 'San Francisco, CA',
+    'about': 'Engineer focused on distributed systems, developer tooling and reliability.',
+    'experience': [
+        'Senior Software Engineer\nExample Corp\n2020 - Present\nLed platform team',
+        'Software Engineer\nSample Inc\n2017 - 2020\nBuilt REST APIs',
+    ],
+    'education': ['State University\nB.S. Computer Science'],
+    'skills': ['Python', 'Go', 'Kubernetes', 'PostgreSQL'],
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(total_requests, concurrency, profiles):
+    urls = [f"https://www.linkedin.com/in/load-test-{i}" for i in range(profiles)]
+    cache = get_profile_cache()
+    for url in urls:
+        cache.put(url, dict(TEST_PROFILE, url=url))
+
+    client = app.test_client()
+
+    def one_request(index):
+        started = time.perf_counter()
+        response = client.post('/generate', data={
+            'linkedin_url': urls[index % len(urls)],
+            'job_title': f'Staff Engineer {index}',
+            'fresh': '1',
+        })
+        if response.status_code != 202:
+            return time.perf_counter() - started, False, False
+
+        # Generation runs in the job queue; follow it until it finishes
+        job = response.get_json()
+        while True:
+            state = client.get(job['status_url']).get_json()['state']
+            if state not in ('queued', 'running'):
+                return time.perf_counter() - started, state == 'done', job['coalesced']
+            time.sleep(0.05)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one_request, range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _, _ in results]
+    failures = sum(1 for _, ok, _ in results if not ok)
+    # A coalesced request rode on another request's job, so it isn't counted as throughput
+    coalesced = sum(1 for _, _, joined in results if joined)
+    print(f"📊 {total_requests} requests, concurrency {concurrency}, {elapsed:.2f}s")
+    print(f"   throughput: {(total_requests - coalesced) / elapsed:.2f} req/s, "
+          f"failures: {failures}, coalesced: {coalesced}")
+    print(f"   latency p50={percentile(latencies, 50):.3f}s "
+          f"p95={percentile(latencies, 95):.3f}s p99={percentile(latencies, 99):.3f}s")
+    print("   llm:", json.dumps(get_resume_generator().llm_client.get_stats()))
+    print("   jobs:", json.dumps(get_job_queue().get_stats()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--profiles', type=int, default=5)
+    args = parser.parse_args()
+    run(args.requests, args.concurrency, args.profiles)
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+import time
+
+
+class OutputStore:
+    """Content-addressed PDF storage with deduplication, TTL and LRU eviction under a size cap"""
+
+    def __init__(self, directory=None, max_bytes=None, ttl=None):
+        self.directory = directory or os.getenv('OUTPUT_DIR', 'output')
+        self.max_bytes = max_bytes or int(float(os.getenv('OUTPUT_MAX_MB', '500')) * 1024 * 1024)
+        self.ttl = ttl if ttl is not None else float(os.getenv('OUTPUT_TTL', '604800'))
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'stored': 0,
+            'deduplicated': 0,
+            'evicted': 0,
+            'expired': 0,
+        }
+
+    def put(self, data):
+        """Store PDF bytes under their SHA-256, reusing an identical existing blob"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+                self.stats['deduplicated'] += 1
+                return digest
+
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.stats['stored'] += 1
+
+        self.evict()
+        return digest
+
+    def blob_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.pdf")
+
+    def open_blob(self, digest):
+        """Return the path for a blob digest if it still exists, refreshing its LRU position"""
+        path = self.blob_path(digest)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def evict(self):
+        """Drop expired blobs, then least recently used ones until under the size cap"""
+        now = time.time()
+        blobs = []
+        total = 0
+
+        with self._lock:
+            try:
+                entries = list(os.scandir(self.directory))
+            except FileNotFoundError:
+                return
+
+            for entry in entries:
+                if not entry.name.endswith('.pdf'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if self.ttl and now - stat.st_mtime > self.ttl:
+                    self._remove(entry.path)
+                    self.stats['expired'] += 1
+                    continue
+                blobs.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            for _, size, path in sorted(blobs):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                self.stats['evicted'] += 1
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_stats(self):
+        """Return counters plus current disk usage"""
+        usage = 0
+        blobs = 0
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.pdf'):
+                    blobs += 1
+                    usage += entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            return dict(self.stats, blobs=blobs, bytes=usage, max_bytes=self.max_bytes)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_output_store():
+    """Return the process-wide output store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = OutputStore()
+        return _store
@@ -5,144 +5,210 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
 from reportlab.lib.colors import black, darkblue
 import os
-from datetime import datetime
+import io
+import hashlib
+import threading
+from types import MappingProxyType
+from xml.sax.saxutils import escape
 import re
+from resume_document import ResumeDocument
+from section_headers import split_sections
+from output_store import get_output_store
+
+# Built once per process; every render shares the same read-only style set
+_styles = None
+_styles_lock = threading.Lock()
+
+def build_resume_styles():
+    """Create the sample stylesheet plus custom styles for the resume"""
+    styles = getSampleStyleSheet()
+    
+    # Header style (for name)
+    styles.add(ParagraphStyle(
+        name='ResumeHeader',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=6,
+        alignment=TA_CENTER,
+        textColor=darkblue,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Subheader style (for contact info)
+    styles.add(ParagraphStyle(
+        name='ContactInfo',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=12,
+        alignment=TA_CENTER,
+        textColor=black
+    ))
+
+    # Section header style
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=12,
+        spaceAfter=6,
+        spaceBefore=12,
+        textColor=darkblue,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Job title style
+    styles.add(ParagraphStyle(
+        name='JobTitle',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=2,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Company style
+    styles.add(ParagraphStyle(
+        name='Company',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=4,
+        fontName='Helvetica-Oblique'
+    ))
+
+    # Regular content style
+    styles.add(ParagraphStyle(
+        name='ResumeContent',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6,
+        alignment=TA_JUSTIFY,
+        leftIndent=20
+    ))
+
+    # Bullet point style
+    styles.add(ParagraphStyle(
+        name='BulletPoint',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=4,
+        leftIndent=20,
+        bulletIndent=10
+    ))
+
+    return styles
+
+def get_resume_styles():
+    """Return the shared, immutable resume style set"""
+    global _styles
+    with _styles_lock:
+        if _styles is None:
+            styles = build_resume_styles()
+            _styles = MappingProxyType({name: styles[name] for name in styles.byName})
+        return _styles
 
 class PDFResumeGenerator:
     def __init__(self):
-        """Initialize the PDF generator with custom styles"""
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
-    
-    def setup_custom_styles(self):
-        """Create custom styles for the resume"""
-        # Header style (for name)
-        self.styles.add(ParagraphStyle(
-            name='ResumeHeader',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=6,
-            alignment=TA_CENTER,
-            textColor=darkblue,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Subheader style (for contact info)
-        self.styles.add(ParagraphStyle(
-            name='ContactInfo',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            textColor=black
-        ))
-        
-        # Section header style
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceAfter=6,
-            spaceBefore=12,
-            textColor=darkblue,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Job title style
-        self.styles.add(ParagraphStyle(
-            name='JobTitle',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=2,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Company style
-        self.styles.add(ParagraphStyle(
-            name='Company',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            fontName='Helvetica-Oblique'
-        ))
-        
-        # Regular content style
-        self.styles.add(ParagraphStyle(
-            name='ResumeContent',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6,
-            alignment=TA_JUSTIFY,
-            leftIndent=20
-        ))
-        
-        # Bullet point style
-        self.styles.add(ParagraphStyle(
-            name='BulletPoint',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            leftIndent=20,
-            bulletIndent=10
-        ))
+        """Initialize the PDF generator with the shared resume styles"""
+        self.styles = get_resume_styles()
 
-    def create_resume_pdf(self, resume_data, profile_data=None):
+    def create_resume_pdf(self, resume_data, profile_data=None, output=None):
         """
         Create a PDF resume from structured data
         
         Args:
-            resume_data (dict): Contains 'formatted_content' and 'sections'
+            resume_data (dict): Contains 'formatted_content' and 'sections', plus an
+                optional 'document' (ResumeDocument or its dict) from structured output
             profile_data (dict): LinkedIn profile data for header
+            output (file-like): Write the PDF here instead of the output store
             
         Returns:
-            str: Path to the generated PDF file
+            str: Path to the stored PDF file (or the output object when given)
         """
         try:
-            # Create output filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            name = profile_data.get('name', 'Resume').replace(' ', '_') if profile_data else 'Resume'
-            filename = f"resume_{name}_{timestamp}.pdf"
-            
-            # Ensure output directory exists
-            output_dir = "output"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            filepath = os.path.join(output_dir, filename)
+            target = output if output is not None else io.BytesIO()
             
             # Create PDF document
             doc = SimpleDocTemplate(
-                filepath,
+                target,
                 pagesize=letter,
                 rightMargin=72,
                 leftMargin=72,
                 topMargin=72,
-                bottomMargin=18
+                bottomMargin=18,
+                # No creation timestamp or random /ID, so identical resumes produce identical bytes
+                # (and share one blob and ETag)
+                invariant=1
             )
             
-            # Build PDF content
-            story = []
-            
-            # Add header section
-            story.extend(self.create_header_section(profile_data))
-            
-            # Add main content sections
-            if 'sections' in resume_data and resume_data['sections']:
-                # Use structured sections if available
-                for section_title, content in resume_data['sections'].items():
-                    story.extend(self.create_section(section_title, content))
-            else:
-                # Fallback to parsing raw text
-                story.extend(self.parse_resume_text(resume_data.get('formatted_content', '')))
-            
             # Build PDF
-            doc.build(story)
+            doc.build(self.create_story(resume_data, profile_data))
             
-            return filepath
+            if output is not None:
+                return output
+            
+            # Identical resumes share one content-addressed file
+            store = get_output_store()
+            return store.blob_path(store.put(target.getvalue()))
             
         except Exception as e:
             print(f"Error generating PDF: {e}")
             raise
 
+    def render_resume_pdf(self, resume_data, profile_data=None, persist=None, spill_bytes=None):
+        """
+        Render a PDF in memory, spilling it to disk only when large or asked to persist
+        
+        Returns:
+            dict: 'data' (bytes, or None once spilled), 'path' and 'digest' of the stored
+                blob (or None), 'etag' and 'size'
+        """
+        if persist is None:
+            persist = os.getenv('PDF_PERSIST', '0') == '1'
+        if spill_bytes is None:
+            spill_bytes = int(float(os.getenv('PDF_SPILL_MB', '2')) * 1024 * 1024)
+        
+        buffer = io.BytesIO()
+        self.create_resume_pdf(resume_data, profile_data, output=buffer)
+        data = buffer.getvalue()
+        
+        rendered = {
+            'data': data,
+            'path': None,
+            'digest': None,
+            'etag': hashlib.sha256(data).hexdigest()[:32],
+            'size': len(data)
+        }
+        
+        if persist or len(data) > spill_bytes:
+            store = get_output_store()
+            rendered['digest'] = store.put(data)
+            rendered['path'] = store.blob_path(rendered['digest'])
+            rendered['data'] = None
+        
+        return rendered
+
+    def create_story(self, resume_data, profile_data=None):
+        """Build the list of flowables for the resume"""
+        story = []
+        
+        # Add header section
+        story.extend(self.create_header_section(profile_data))
+        
+        # Add main content sections
+        if resume_data.get('document'):
+            # Structured output is already validated; render it without re-parsing text
+            document = resume_data['document']
+            if not isinstance(document, ResumeDocument):
+                document = ResumeDocument.from_dict(document)
+            story.extend(self.create_document_sections(document))
+        elif 'sections' in resume_data and resume_data['sections']:
+            # Use structured sections if available
+            for section_title, content in resume_data['sections'].items():
+                story.extend(self.create_section(section_title, content))
+        else:
+            # Fallback to parsing raw text
+            story.extend(self.parse_resume_text(resume_data.get('formatted_content', '')))
+        
+        return story
+
     def create_header_section(self, profile_data):
         """Create header section with name and contact info"""
         elements = []
@@ -191,6 +257,43 @@ class PDFResumeGenerator:
         
         return elements
 
+    def create_document_sections(self, document):
+        """Render a structured ResumeDocument"""
+        elements = []
+        
+        elements.append(Paragraph('PROFESSIONAL SUMMARY', self.styles['SectionHeader']))
+        elements.append(Paragraph(escape(document.summary), self.styles['ResumeContent']))
+        
+        if document.competencies:
+            elements.append(Paragraph('CORE COMPETENCIES', self.styles['SectionHeader']))
+            for item in document.competencies:
+                elements.append(Paragraph(escape(item), self.styles['BulletPoint'], bulletText='•'))
+        
+        if document.experience:
+            elements.append(Paragraph('PROFESSIONAL EXPERIENCE', self.styles['SectionHeader']))
+            for entry in document.experience:
+                elements.append(Paragraph(escape(entry.title), self.styles['JobTitle']))
+                company = ' | '.join(part for part in (entry.company, entry.dates) if part)
+                if company:
+                    elements.append(Paragraph(escape(company), self.styles['Company']))
+                for bullet in entry.bullets:
+                    elements.append(Paragraph(escape(bullet), self.styles['BulletPoint'], bulletText='•'))
+                elements.append(Spacer(1, 8))
+        
+        if document.education:
+            elements.append(Paragraph('EDUCATION', self.styles['SectionHeader']))
+            for entry in document.education:
+                text = ' - '.join(part for part in (entry.degree, entry.school) if part)
+                if entry.dates:
+                    text += f" ({entry.dates})"
+                elements.append(Paragraph(escape(text), self.styles['ResumeContent']))
+        
+        if document.technical_skills:
+            elements.append(Paragraph('TECHNICAL SKILLS', self.styles['SectionHeader']))
+            elements.append(Paragraph(escape(', '.join(document.technical_skills)), self.styles['ResumeContent']))
+        
+        return elements
+
     def parse_resume_text(self, resume_text):
         """Parse raw resume text into structured elements"""
         story = []
@@ -203,35 +306,7 @@ class PDFResumeGenerator:
 
     def split_into_sections(self, text):
         """Split text into sections based on headers"""
-        sections = []
-        current_section = ""
-        current_content = []
-        
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if line is a section header
-            if (line.isupper() and len(line) > 3) or \
-               any(line.upper().startswith(header) for header in 
-                   ['CONTACT', 'PROFESSIONAL', 'EXPERIENCE', 'EDUCATION', 'SKILLS', 'SUMMARY']):
-                
-                # Save previous section
-                if current_section:
-                    sections.append((current_section, '\n'.join(current_content)))
-                
-                # Start new section
-                current_section = line
-                current_content = []
-            else:
-                current_content.append(line)
-        
-        # Add last section
-        if current_section:
-            sections.append((current_section, '\n'.join(current_content)))
-        
-        return sections
+        return split_sections(text)
 
     def create_experience_section(self, content):
         """Format experience section"""
@@ -0,0 +1,205 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from pdf_generator import PDFResumeGenerator, get_resume_styles
+
+
+class PDFQueueFull(Exception):
+    """Raised when the renderer already has as many jobs as it will queue"""
+
+
+class PDFWorkerDied(RuntimeError):
+    """Raised when a worker process exits in the middle of a render"""
+
+
+def _warm_worker():
+    # Import ReportLab and build the shared styles before the first job arrives
+    get_resume_styles()
+
+
+def _render_job(resume_data, profile_data, persist, spill_bytes):
+    return PDFResumeGenerator().render_resume_pdf(resume_data, profile_data, persist, spill_bytes)
+
+
+def _worker_main(conn):
+    """Worker process loop: render each job received on the pipe and send back the outcome"""
+    _warm_worker()
+    conn.send(('ready', None))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            conn.send(('ok', _render_job(*job)))
+        except Exception as e:
+            try:
+                conn.send(('error', e))
+            except Exception:  # the exception itself does not pickle
+                conn.send(('error', RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """One renderer process and the pipe used to hand it jobs"""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def wait_ready(self):
+        self.conn.recv()
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.terminate()
+            self.process.join(1)
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.conn.close()
+
+
+class PDFWorkerPool:
+    """Pre-warmed process pool so PDF rendering scales across cores instead of sharing one GIL"""
+
+    def __init__(self, workers=None, queue_depth=None, job_timeout=None, max_jobs_per_worker=None):
+        self.workers = workers or int(os.getenv('PDF_WORKERS', str(os.cpu_count() or 2)))
+        self.queue_depth = queue_depth if queue_depth is not None else int(os.getenv('PDF_QUEUE_DEPTH', '16'))
+        self.job_timeout = job_timeout or float(os.getenv('PDF_JOB_TIMEOUT', '30'))
+        # Workers are replaced after this many jobs to cap any ReportLab memory growth
+        self.max_jobs_per_worker = max_jobs_per_worker or int(os.getenv('PDF_MAX_JOBS_PER_WORKER', '200'))
+
+        # Running plus waiting jobs; anything beyond is rejected rather than queued forever
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+        self._lock = threading.Lock()
+        self.stats = {
+            'jobs': 0,
+            'completed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'failures': 0,
+            'restarts': 0,
+            'queue_seconds': 0.0,
+            'render_seconds': 0.0,
+        }
+        # Each job checks out one worker, so a stuck render can be killed without touching the others
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        self._running = set()
+        # Start every worker now so requests never pay the spawn cost
+        for worker in self._start(self.workers):
+            self._idle.put(worker)
+
+    def _start(self, count):
+        started = [_Worker(self._context) for _ in range(count)]
+        for worker in started:
+            worker.wait_ready()
+        with self._lock:
+            self._running.update(started)
+        return started
+
+    def render(self, resume_data, profile_data=None, persist=None, spill_bytes=None):
+        """Render a resume in a worker process, returning the render_resume_pdf result"""
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise PDFQueueFull("PDF renderer is at capacity")
+
+        self._count('jobs')
+        queued = time.monotonic()
+        worker = self._idle.get()
+        started = time.monotonic()
+        self._count('queue_seconds', started - queued)
+        try:
+            try:
+                worker.conn.send((resume_data, profile_data, persist, spill_bytes))
+                # Only the render itself is timed, not the wait for a free worker
+                outcome = worker.conn.recv() if worker.conn.poll(self.job_timeout) else None
+            except (EOFError, OSError):
+                self._count('failures')
+                self._replace(worker)
+                raise PDFWorkerDied("PDF worker process exited during a render") from None
+            if outcome is None:
+                self._count('timeouts')
+                # A stuck ReportLab build cannot be cancelled in place; replace just this worker
+                self._replace(worker)
+                raise TimeoutError(f"PDF rendering took longer than {self.job_timeout:.0f}s")
+            self._release(worker)
+        finally:
+            self._count('render_seconds', time.monotonic() - started)
+            self._slots.release()
+
+        status, value = outcome
+        if status == 'error':
+            self._count('failures')
+            raise value
+        self._count('completed')
+        return value
+
+    def _release(self, worker):
+        worker.jobs += 1
+        if worker.jobs >= self.max_jobs_per_worker:
+            self._replace(worker, kill=False)
+        else:
+            self._idle.put(worker)
+
+    def _replace(self, worker, kill=True):
+        with self._lock:
+            self._running.discard(worker)
+            if kill:
+                self.stats['restarts'] += 1
+        worker.stop(kill=kill)
+        self._idle.put(self._start(1)[0])
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def get_stats(self):
+        """Return job counters and pool configuration"""
+        with self._lock:
+            return dict(self.stats, workers=self.workers, queue_depth=self.queue_depth, idle=self._idle.qsize())
+
+    def close(self):
+        with self._lock:
+            running, self._running = self._running, set()
+        for worker in running:
+            worker.stop(kill=True)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pdf_worker_pool():
+    """Return the process-wide PDF worker pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PDFWorkerPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def warm_pdf_renderer():
+    """Do the one-time renderer setup ahead of the first PDF: start the pool or build the styles"""
+    if os.getenv('PDF_RENDERER', 'inline') == 'process':
+        get_pdf_worker_pool()
+    else:
+        get_resume_styles()
+
+
+def render_pdf(resume_data, profile_data=None, persist=None):
+    """Render in the worker pool when PDF_RENDERER=process, otherwise in this thread"""
+    if os.getenv('PDF_RENDERER', 'inline') == 'process':
+        return get_pdf_worker_pool().render(resume_data, profile_data, persist)
+    return PDFResumeGenerator().render_resume_pdf(resume_data, profile_data, persist)
@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from admission import get_admission
+from ai_resume_generator import get_resume_generator
+from browser_pool import get_driver_pool
+from linkedin_scraper import LinkedInScraper
+from pdf_worker_pool import warm_pdf_renderer
+from profile_cache import get_profile_cache
+
+# Profile fields that are final once each scrape stage has been yielded
+STAGE_FIELDS = {
+    'header': ('name', 'headline', 'location', 'about'),
+    'experience': ('experience',),
+    'education': ('education',),
+    'skills': ('skills',),
+}
+
+# One-off setup work that runs while the browser is still loading the profile
+_warmers = ThreadPoolExecutor(max_workers=2, thread_name_prefix='warm')
+
+
+def warm_up():
+    """Resolve the AI model and prepare the PDF renderer in the background"""
+    return [
+        _warmers.submit(lambda: get_resume_generator().resolve_model()),
+        _warmers.submit(warm_pdf_renderer),
+    ]
+
+
+def profile_stages(linkedin_url, force_refresh=False, early_header=False, timeout=None):
+    """
+    Yield (stage, profile_data) from the cache in one step, or section by section from a pooled browser
+
+    Only a successful load ends with the 'complete' stage. early_header asks snapshot
+    scrapes for a separate 'header' stage too. timeout (e.g. a job's remaining time) bounds
+    the scrape queue, the browser checkout, the page load and the section waits.
+    """
+    cache = get_profile_cache()
+
+    if not force_refresh:
+        profile_data = cache.get(linkedin_url)
+        if profile_data:
+            print(f"📦 Using cached profile for {linkedin_url}")
+            yield 'complete', profile_data
+            return
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def remaining():
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    # Borrow a warm browser from the pool instead of launching Chrome per request; the scrape
+    # gate bounds how many requests may queue for one (AdmissionRejected beyond that)
+    profile_data = None
+    with get_admission().admit('scrape', timeout=remaining()), \
+            get_driver_pool().driver(remaining(), page_load_timeout=remaining()) as driver:
+        scraper = LinkedInScraper(driver=driver)
+        if deadline is not None:
+            scraper.wait_budget = min(scraper.wait_budget, remaining())
+        try:
+            for stage, profile_data in scraper.scrape_profile_stages(linkedin_url, early_header):
+                if stage != 'complete':
+                    yield stage, profile_data
+        except Exception as e:
+            # A page that failed to load doesn't mean the browser is broken; keep it in the pool
+            print(f"Error scraping profile: {e}")
+            return
+
+    # Don't cache login walls or pages that failed to render
+    if profile_data.get('name') != 'Name not found':
+        cache.put(linkedin_url, profile_data)
+
+    # Only now, with the browser back in the pool and the cache updated
+    yield 'complete', profile_data
+
+
+def load_profile(linkedin_url, force_refresh=False):
+    """Return profile data from the cache, scraping only on a miss"""
+    for stage, profile_data in profile_stages(linkedin_url, force_refresh):
+        if stage == 'complete':
+            return profile_data
+    return None
+
+
+def load_profile_early(linkedin_url, job_title=None, force_refresh=False, on_stage=None, use_cache=True,
+                       timeout=None):
+    """
+    Load a profile, starting AI sections as soon as the fields they need are scraped
+
+    Args:
+        on_stage (callable): Called with each scrape stage name as it completes
+        use_cache (bool): Skip sections already in the AI response cache (False forces fresh calls)
+        timeout (float): Seconds the scrape may take in all, e.g. what is left of the job's deadline
+
+    Returns:
+        tuple: (profile_data or None, in_flight) for generate_resume_content(in_flight=...)
+    """
+    generator = get_resume_generator()
+    in_flight = {}
+    fields = set()
+
+    # The separate header parse only pays off when some section can start from it
+    stages = profile_stages(linkedin_url, force_refresh, early_header=generator.starts_early(), timeout=timeout)
+    for stage, profile_data in stages:
+        if on_stage:
+            on_stage(stage)
+        if stage == 'complete':
+            return profile_data, in_flight
+        if profile_data.get('name') != 'Name not found':  # login walls aren't worth an AI call
+            fields.update(STAGE_FIELDS[stage])
+            # Early calls take an AI slot only if one is free right away, and keep it until they end
+            generator.start_sections(
+                profile_data, job_title, fields, in_flight, use_cache=use_cache,
+                acquire=lambda: get_admission().acquire('llm', wait=False)
+            )
+
+    # The scrape failed part way; drop whatever has not started yet
+    for future in in_flight.values():
+        future.cancel()
+    return None, {}
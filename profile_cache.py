@@ -0,0 +1,149 @@
+from urllib.parse import urlsplit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def normalize_linkedin_url(url):
+    """Canonicalize a profile URL so equivalent links share one cache entry"""
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+    path = parts.path.rstrip('/').lower()
+
+    # uk.linkedin.com, www.linkedin.com and linkedin.com all serve the same profile
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        host = 'www.linkedin.com'
+
+    return f"https://{host}{path}"
+
+
+class ProfileCache:
+    """Disk-backed cache of scraped profile data keyed by normalized URL"""
+
+    def __init__(self, path=None, ttl=None, max_bytes=None):
+        self.path = path or os.getenv('PROFILE_CACHE_PATH', os.path.join('cache', 'profiles.sqlite3'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('PROFILE_CACHE_TTL', '86400'))
+        self.max_bytes = max_bytes or int(float(os.getenv('PROFILE_CACHE_MAX_MB', '50')) * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    url TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, linkedin_url):
+        """Return cached profile data, or None on a miss or expired entry"""
+        key = normalize_linkedin_url(linkedin_url)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, created_at FROM profiles WHERE url = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            data, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                conn.execute("DELETE FROM profiles WHERE url = ?", (key,))
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            conn.execute("UPDATE profiles SET accessed_at = ? WHERE url = ?", (now, key))
+            self.stats['hits'] += 1
+
+        return json.loads(data)
+
+    def contains(self, linkedin_url):
+        """Check for a fresh entry without counting a lookup or refreshing its LRU position"""
+        key = normalize_linkedin_url(linkedin_url)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT created_at FROM profiles WHERE url = ?", (key,)).fetchone()
+        return row is not None and not (self.ttl and time.time() - row[0] > self.ttl)
+
+    def put(self, linkedin_url, profile_data):
+        """Store profile data and evict least recently used entries over the size cap"""
+        key = normalize_linkedin_url(linkedin_url)
+        data = json.dumps(profile_data)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (url, data, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now)
+            )
+            self._evict(conn)
+
+    def invalidate(self, linkedin_url):
+        """Drop the cached entry for a URL"""
+        key = normalize_linkedin_url(linkedin_url)
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM profiles WHERE url = ?", (key,))
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM profiles").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for url, size in conn.execute(
+            "SELECT url, size FROM profiles ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM profiles WHERE url = ?", (url,))
+            total -= size
+            self.stats['evictions'] += 1
+
+    def get_stats(self):
+        """Return hit/miss counters and current cache size"""
+        with self._lock, self._connect() as conn:
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM profiles"
+            ).fetchone()
+            stats = dict(self.stats, entries=entries, bytes=total)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache():
+    """Return the process-wide profile cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProfileCache()
+        return _cache
@@ -0,0 +1,156 @@
+from bs4 import BeautifulSoup
+import json
+import sys
+
+# CSS selectors tried in order for each profile field (shared with LinkedInScraper)
+NAME_SELECTORS = [
+    "h1.text-heading-xlarge",
+    "h1",
+    ".pv-text-details__left-panel h1",
+    ".ph5 h1"
+]
+
+HEADLINE_SELECTORS = [
+    ".text-body-medium.break-words",
+    ".pv-text-details__left-panel .text-body-medium",
+    ".ph5 .text-body-medium"
+]
+
+LOCATION_SELECTORS = [
+    ".text-body-small.inline.t-black--light.break-words",
+    ".pv-text-details__left-panel .text-body-small",
+    ".ph5 .text-body-small"
+]
+
+ABOUT_SELECTORS = [
+    ".pv-shared-text-with-see-more .full-width",
+    ".display-flex.ph5 .pv-shared-text-with-see-more",
+    ".artdeco-card .pv-shared-text-with-see-more"
+]
+
+EXPERIENCE_SELECTORS = [
+    ".pvs-list__paged-list-item",
+    ".experience-section .pv-entity__summary-info",
+    ".pv-profile-section__card-item-v2"
+]
+
+EDUCATION_SELECTORS = [
+    ".education-section .pv-entity__summary-info",
+    ".pvs-list__paged-list-item .pvs-entity",
+    ".pv-profile-section__card-item-v2"
+]
+
+SKILL_SELECTORS = [
+    ".pv-skill-category-entity__name-text",
+    ".pvs-list__paged-list-item .mr1",
+    ".skill-category-entity__name"
+]
+
+
+class ProfileParser:
+    """Extract profile data from a single HTML snapshot without a browser"""
+
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser')
+        # Screen-reader copies duplicate the visible text; the browser's .text skips them
+        for hidden in self.soup.select('.visually-hidden'):
+            hidden.decompose()
+
+    def parse(self, linkedin_url=''):
+        """Run every extractor over the snapshot and return profile data"""
+        profile_data = self.parse_header(linkedin_url)
+        profile_data.update({
+            'experience': self.extract_experience(),
+            'education': self.extract_education(),
+            'skills': self.extract_skills()
+        })
+        return profile_data
+
+    def parse_header(self, linkedin_url=''):
+        """Extract only the top card and about section (list sections left empty)"""
+        return {
+            'name': self.extract_name(),
+            'headline': self.extract_headline(),
+            'location': self.extract_location(),
+            'about': self.extract_about(),
+            'experience': [],
+            'education': [],
+            'skills': [],
+            'url': linkedin_url
+        }
+
+    def first_text(self, selectors, accept=None):
+        """Return the first non-empty text matching any selector"""
+        for selector in selectors:
+            element = self.soup.select_one(selector)
+            if element is None:
+                continue
+            text = self.element_text(element)
+            if text and (accept is None or accept(text)):
+                return text
+        return None
+
+    def list_texts(self, selectors, limit, accept):
+        """Return texts from the first selector that matches anything"""
+        for selector in selectors:
+            elements = self.soup.select(selector)
+            if elements:
+                texts = [self.element_text(element) for element in elements[:limit]]
+                return [text for text in texts if text and accept(text)]
+        return []
+
+    def element_text(self, element):
+        return element.get_text(separator='\n', strip=True)
+
+    def extract_name(self):
+        """Extract user's name"""
+        return self.first_text(NAME_SELECTORS) or "Name not found"
+
+    def extract_headline(self):
+        """Extract user's headline/title"""
+        # Avoid short irrelevant text
+        return self.first_text(HEADLINE_SELECTORS, lambda text: len(text) > 10) or "Professional"
+
+    def extract_location(self):
+        """Extract user's location"""
+        return self.first_text(
+            LOCATION_SELECTORS, lambda text: "connections" not in text.lower()
+        ) or "Location not specified"
+
+    def extract_about(self):
+        """Extract about section"""
+        return self.first_text(ABOUT_SELECTORS) or "No about section available"
+
+    def extract_experience(self):
+        """Extract work experience (first 5 meaningful entries)"""
+        return self.list_texts(EXPERIENCE_SELECTORS, 5, lambda text: len(text) > 20)
+
+    def extract_education(self):
+        """Extract education information (first 3 entries)"""
+        return self.list_texts(EDUCATION_SELECTORS, 3, lambda text: len(text) > 15)
+
+    def extract_skills(self):
+        """Extract skills (first 10, skills should be short)"""
+        return self.list_texts(SKILL_SELECTORS, 10, lambda text: len(text) < 50)
+
+
+def parse_profile_html(html, linkedin_url=''):
+    """Parse a LinkedIn profile page's HTML into profile data"""
+    return ProfileParser(html).parse(linkedin_url)
+
+
+def parse_profile_header(html, linkedin_url=''):
+    """Parse just the header fields, e.g. before the rest of the page has loaded"""
+    return ProfileParser(html).parse_header(linkedin_url)
+
+
+def parse_profile_file(path, linkedin_url=''):
+    """Parse a saved profile page from disk"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_profile_html(f.read(), linkedin_url)
+
+
+if __name__ == "__main__":
+    # Re-parse archived pages: python profile_parser.py page.html [page2.html ...]
+    for path in sys.argv[1:]:
+        print(json.dumps(parse_profile_file(path), indent=2))
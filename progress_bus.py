@@ -0,0 +1,92 @@
+from collections import OrderedDict
+import os
+import threading
+
+
+class ProgressBus:
+    """In-process publish/subscribe of session stage updates, so clients wait instead of polling"""
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = max_sessions or int(os.getenv('PROGRESS_BUS_MAX', '10000'))
+
+        self._lock = threading.Lock()
+        # session_id -> {'version', 'state', 'condition'}, oldest first
+        self._channels = OrderedDict()
+        self.stats = {
+            'published': 0,
+            'delivered': 0,
+            'timeouts': 0,
+            'waiting': 0,
+        }
+
+    def _channel(self, session_id):
+        channel = self._channels.get(session_id)
+        if channel is None:
+            # Each session gets its own condition so a publish only wakes that session's waiters
+            channel = {'version': 0, 'state': {}, 'condition': threading.Condition(self._lock)}
+            self._channels[session_id] = channel
+            while len(self._channels) > self.max_sessions:
+                _, dropped = self._channels.popitem(last=False)
+                dropped['condition'].notify_all()
+        return channel
+
+    def publish(self, session_id, **fields):
+        """Merge fields into the session's state and wake its subscribers"""
+        with self._lock:
+            channel = self._channel(session_id)
+            channel['state'].update(fields)
+            channel['version'] += 1
+            self.stats['published'] += 1
+            channel['condition'].notify_all()
+
+    def wait(self, session_id, after=0, timeout=None):
+        """
+        Block until the session's version passes `after`; returns (version, state) or None on timeout
+        
+        Returns None at once for a session nothing has been published for, so unknown IDs
+        neither hold the caller nor take a channel from a real session.
+        """
+        with self._lock:
+            channel = self._channels.get(session_id)
+            if channel is None:
+                return None
+            self.stats['waiting'] += 1
+            try:
+                updated = channel['condition'].wait_for(lambda: channel['version'] > after, timeout)
+            finally:
+                self.stats['waiting'] -= 1
+            if not updated:
+                self.stats['timeouts'] += 1
+                return None
+            self.stats['delivered'] += 1
+            return channel['version'], dict(channel['state'])
+
+    def version(self, session_id):
+        """Current version of a session's state (0 before its first publish)"""
+        with self._lock:
+            channel = self._channels.get(session_id)
+            return channel['version'] if channel else 0
+
+    def discard(self, session_id):
+        with self._lock:
+            channel = self._channels.pop(session_id, None)
+            if channel:
+                channel['condition'].notify_all()
+
+    def get_stats(self):
+        """Return publish/delivery counters and current subscriber count"""
+        with self._lock:
+            return dict(self.stats, sessions=len(self._channels))
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_progress_bus():
+    """Return the process-wide progress bus"""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = ProgressBus()
+        return _bus
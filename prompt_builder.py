@@ -0,0 +1,162 @@
+from collections import Counter
+import math
+import os
+import re
+import threading
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Words that carry no signal when matching profile text to a job title
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+    'i', 'in', 'is', 'it', 'its', 'my', 'of', 'on', 'or', 'our', 'that', 'the',
+    'their', 'this', 'to', 'was', 'we', 'were', 'with', 'you', 'your'
+}
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate (~4 characters per token for English text)"""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def tokenize(text):
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_RE.split(text or '') if sentence.strip()]
+
+
+def entry_text(entry):
+    """Flatten a scraped entry (raw text or dict) into plain text"""
+    if isinstance(entry, dict):
+        return ' '.join(str(value) for value in entry.values() if value)
+    return str(entry)
+
+
+class TfidfScorer:
+    """Sparse TF-IDF vectors over a small document set, scored by cosine similarity"""
+
+    def __init__(self, documents):
+        self.term_counts = [Counter(tokenize(document)) for document in documents]
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+
+        total = len(documents)
+        self.idf = {
+            term: math.log((1 + total) / (1 + frequency)) + 1
+            for term, frequency in document_frequency.items()
+        }
+        self.vectors = [self.vectorize(counts) for counts in self.term_counts]
+
+    def vectorize(self, counts):
+        vector = {term: count * self.idf.get(term, 1.0) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm:
+            vector = {term: weight / norm for term, weight in vector.items()}
+        return vector
+
+    def scores(self, query):
+        """Cosine similarity of every document to the query"""
+        query_vector = self.vectorize(Counter(tokenize(query)))
+        if not query_vector:
+            return [0.0] * len(self.vectors)
+        return [
+            sum(weight * query_vector.get(term, 0.0) for term, weight in vector.items())
+            for vector in self.vectors
+        ]
+
+
+class PromptBuilder:
+    """Fit profile content into a token budget, keeping what matters most for the job title"""
+
+    def __init__(self, token_budget=None, count_tokens=None):
+        self.token_budget = token_budget or int(os.getenv('PROMPT_TOKEN_BUDGET', '2000'))
+        # Used for the full and final prompt; individual items use the local estimate
+        self.count_tokens = count_tokens or estimate_tokens
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'prompts': 0,
+            'trimmed': 0,
+            'tokens_saved': 0,
+        }
+
+    def fit(self, profile_data, job_title, render):
+        """Return (prompt, report) where render(profile_data) -> prompt text"""
+        full_prompt = render(profile_data)
+        full_tokens = self.count_tokens(full_prompt)
+
+        if full_tokens <= self.token_budget:
+            report = {'tokens_full': full_tokens, 'tokens_used': full_tokens, 'tokens_saved': 0, 'dropped': {}}
+            self.record(report)
+            return full_prompt, report
+
+        trimmed = self.select(profile_data, job_title, render)
+        prompt = render(trimmed)
+        used_tokens = self.count_tokens(prompt)
+
+        report = {
+            'tokens_full': full_tokens,
+            'tokens_used': used_tokens,
+            'tokens_saved': full_tokens - used_tokens,
+            'dropped': {
+                'about_sentences': len(split_sentences(profile_data.get('about', ''))) - len(split_sentences(trimmed['about'])),
+                'experience': len(profile_data.get('experience', [])) - len(trimmed['experience']),
+                'skills': len(profile_data.get('skills', [])) - len(trimmed['skills']),
+            }
+        }
+        print(f"✂️ Prompt trimmed from {full_tokens} to {used_tokens} tokens "
+              f"(saved {report['tokens_saved']})")
+        self.record(report)
+        return prompt, report
+
+    def select(self, profile_data, job_title, render):
+        """Greedily keep the highest-scoring about sentences, experience entries and skills"""
+        about_sentences = split_sentences(profile_data.get('about', ''))
+        experience = list(profile_data.get('experience', []))
+        skills = list(profile_data.get('skills', []))
+
+        candidates = (
+            [('about', index, sentence) for index, sentence in enumerate(about_sentences)] +
+            [('experience', index, entry_text(entry)) for index, entry in enumerate(experience)] +
+            [('skills', index, skill) for index, skill in enumerate(skills)]
+        )
+
+        # Without a target role, rank against the person's own headline
+        query = job_title or profile_data.get('headline', '')
+        scores = TfidfScorer([text for _, _, text in candidates]).scores(query)
+
+        base = dict(profile_data, about='', experience=[], skills=[])
+        remaining = self.token_budget - estimate_tokens(render(base))
+
+        # Highest score first; ties go to earlier (more recent / more prominent) content
+        ranked = sorted(zip(scores, candidates), key=lambda item: (-item[0], item[1][1]))
+        kept = {'about': set(), 'experience': set(), 'skills': set()}
+        for _, (kind, index, text) in ranked:
+            cost = estimate_tokens(text) + 2  # separators / bullet markers
+            if cost <= remaining:
+                kept[kind].add(index)
+                remaining -= cost
+
+        # Render kept content in its original order
+        return dict(
+            profile_data,
+            about=' '.join(sentence for index, sentence in enumerate(about_sentences) if index in kept['about']),
+            experience=[entry for index, entry in enumerate(experience) if index in kept['experience']],
+            skills=[skill for index, skill in enumerate(skills) if index in kept['skills']]
+        )
+
+    def record(self, report):
+        with self._lock:
+            self.stats['prompts'] += 1
+            if report['tokens_saved']:
+                self.stats['trimmed'] += 1
+                self.stats['tokens_saved'] += report['tokens_saved']
+
+    def get_stats(self):
+        """Return prompt counts and total tokens saved"""
+        with self._lock:
+            return dict(self.stats, token_budget=self.token_budget)
@@ -0,0 +1,164 @@
+from dataclasses import dataclass, field, asdict
+from typing import List
+import json
+
+# Response schema for Gemini's structured output (OpenAPI subset accepted by response_schema)
+RESUME_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'summary': {'type': 'string'},
+        'competencies': {'type': 'array', 'items': {'type': 'string'}},
+        'experience': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'title': {'type': 'string'},
+                    'company': {'type': 'string'},
+                    'dates': {'type': 'string'},
+                    'bullets': {'type': 'array', 'items': {'type': 'string'}},
+                },
+                'required': ['title', 'bullets'],
+            },
+        },
+        'education': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'degree': {'type': 'string'},
+                    'school': {'type': 'string'},
+                    'dates': {'type': 'string'},
+                },
+                'required': ['degree'],
+            },
+        },
+        'technical_skills': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': ['summary', 'competencies', 'experience', 'education', 'technical_skills'],
+}
+
+
+@dataclass
+class ExperienceEntry:
+    title: str
+    company: str = ''
+    dates: str = ''
+    bullets: List[str] = field(default_factory=list)
+
+
+@dataclass
+class EducationEntry:
+    degree: str
+    school: str = ''
+    dates: str = ''
+
+
+@dataclass
+class ResumeDocument:
+    """Validated, structured resume produced by the AI's JSON output mode"""
+    summary: str
+    competencies: List[str] = field(default_factory=list)
+    experience: List[ExperienceEntry] = field(default_factory=list)
+    education: List[EducationEntry] = field(default_factory=list)
+    technical_skills: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, text):
+        """Parse and validate the model's JSON response"""
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"Resume response is not valid JSON: {e}")
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Validate a plain dict (e.g. from JSON or the response cache)"""
+        if not isinstance(data, dict):
+            raise ValueError("Resume document must be a JSON object")
+
+        summary = data.get('summary')
+        if not isinstance(summary, str) or not summary.strip():
+            raise ValueError("Resume document is missing a summary")
+
+        experience = []
+        for entry in _list_of(data, 'experience', dict):
+            if not _text(entry.get('title')):
+                raise ValueError("Experience entry is missing a title")
+            experience.append(ExperienceEntry(
+                title=_text(entry['title']),
+                company=_text(entry.get('company')),
+                dates=_text(entry.get('dates')),
+                bullets=[_text(bullet) for bullet in _list_of(entry, 'bullets', str) if _text(bullet)],
+            ))
+
+        education = []
+        for entry in _list_of(data, 'education', dict):
+            if not _text(entry.get('degree')):
+                raise ValueError("Education entry is missing a degree")
+            education.append(EducationEntry(
+                degree=_text(entry['degree']),
+                school=_text(entry.get('school')),
+                dates=_text(entry.get('dates')),
+            ))
+
+        return cls(
+            summary=summary.strip(),
+            competencies=[_text(item) for item in _list_of(data, 'competencies', str) if _text(item)],
+            experience=experience,
+            education=education,
+            technical_skills=[_text(item) for item in _list_of(data, 'technical_skills', str) if _text(item)],
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_sections(self):
+        """Section mapping in the shape parse_resume_response produces"""
+        sections = {'PROFESSIONAL SUMMARY': self.summary}
+        if self.competencies:
+            sections['CORE COMPETENCIES'] = '\n'.join(f"• {item}" for item in self.competencies)
+        if self.experience:
+            sections['PROFESSIONAL EXPERIENCE'] = '\n\n'.join(self._experience_text(entry) for entry in self.experience)
+        if self.education:
+            sections['EDUCATION'] = '\n'.join(self._education_text(entry) for entry in self.education)
+        if self.technical_skills:
+            sections['TECHNICAL SKILLS'] = ', '.join(self.technical_skills)
+        return sections
+
+    def to_text(self):
+        """Plain-text resume for previews and formatted_content"""
+        return '\n\n'.join(f"{title}\n{content}" for title, content in self.to_sections().items())
+
+    @staticmethod
+    def _experience_text(entry):
+        heading = entry.title
+        if entry.company:
+            heading += f" | {entry.company}"
+        if entry.dates:
+            heading += f" ({entry.dates})"
+        return '\n'.join([heading] + [f"• {bullet}" for bullet in entry.bullets])
+
+    @staticmethod
+    def _education_text(entry):
+        text = entry.degree
+        if entry.school:
+            text += f" | {entry.school}"
+        if entry.dates:
+            text += f" ({entry.dates})"
+        return text
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ''
+
+
+def _list_of(data, key, item_type):
+    value = data.get(key) or []
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' must be a list")
+    for item in value:
+        if not isinstance(item, item_type):
+            raise ValueError(f"'{key}' entries must be {item_type.__name__} values")
+    return value
@@ -0,0 +1,119 @@
+from html import escape
+import gzip
+import hashlib
+
+from section_headers import split_sections
+
+BULLET_MARKERS = ('•', '-', '*', '–')
+
+PREVIEW_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>Resume Preview</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }}
+.resume {{ border: 1px solid #ddd; padding: 20px 30px; background: #f9f9f9; max-width: 800px; }}
+.resume h1 {{ color: #00008b; text-align: center; margin-bottom: 0; }}
+.resume .contact {{ text-align: center; color: #555; margin-top: 4px; }}
+.resume h2 {{ color: #00008b; font-size: 16px; border-bottom: 1px solid #ccc; margin-top: 24px; }}
+.resume ul {{ margin: 4px 0 12px; }}
+.download {{ display: inline-block; margin-top: 20px; background: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; }}
+</style>
+</head>
+<body>
+<h2>Resume Preview</h2>
+<div class="resume">
+{body}
+</div>
+<a class="download" href="/download/{session_id}">Download PDF</a>
+</body>
+</html>
+"""
+
+
+def resume_sections(resume_data):
+    """Sections as [(title, content)], splitting the raw text only when none were parsed"""
+    if resume_data.get('sections'):
+        return list(resume_data['sections'].items())
+    return split_sections(resume_data.get('formatted_content', ''))
+
+
+def render_section_html(content):
+    """Paragraphs for plain lines, lists for runs of bullet lines"""
+    parts = []
+    bullets = []
+
+    def flush():
+        if bullets:
+            parts.append('<ul>' + ''.join(f'<li>{escape(item)}</li>' for item in bullets) + '</ul>')
+            bullets.clear()
+
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            flush()
+        elif line.startswith(BULLET_MARKERS):
+            bullets.append(line.lstrip(''.join(BULLET_MARKERS)).strip())
+        else:
+            flush()
+            parts.append(f'<p>{escape(line)}</p>')
+    flush()
+    return '\n'.join(parts)
+
+
+def render_html(resume_data, profile_data=None, session_id=''):
+    """Structured HTML preview page for a resume"""
+    body = []
+    if profile_data:
+        body.append(f"<h1>{escape(profile_data.get('name', ''))}</h1>")
+        contact = [profile_data[key] for key in ('location', 'email', 'phone', 'url') if profile_data.get(key)]
+        if contact:
+            body.append(f'<p class="contact">{escape(" | ".join(contact))}</p>')
+
+    sections = resume_sections(resume_data)
+    if sections:
+        for title, content in sections:
+            body.append(f'<h2>{escape(title)}</h2>')
+            body.append(render_section_html(content))
+    else:
+        body.append(render_section_html(resume_data.get('formatted_content', '')))
+
+    return PREVIEW_TEMPLATE.format(body='\n'.join(body), session_id=escape(session_id))
+
+
+def render_text(resume_data, profile_data=None):
+    """Plain-text export of a resume"""
+    lines = []
+    if profile_data:
+        lines.append(profile_data.get('name', ''))
+        contact = [profile_data[key] for key in ('location', 'email', 'phone', 'url') if profile_data.get(key)]
+        if contact:
+            lines.append(' | '.join(contact))
+        lines.append('')
+
+    sections = resume_sections(resume_data)
+    if sections:
+        for title, content in sections:
+            lines.extend([title, content, ''])
+    else:
+        lines.append(resume_data.get('formatted_content', ''))
+
+    return '\n'.join(lines).strip() + '\n'
+
+
+def render_previews(resume_data, profile_data=None, session_id=''):
+    """Render every preview format once, with ETags and pre-gzipped bodies for serving"""
+    previews = {}
+    for fmt, mimetype, text in [
+        ('html', 'text/html', render_html(resume_data, profile_data, session_id)),
+        ('text', 'text/plain', render_text(resume_data, profile_data)),
+    ]:
+        body = text.encode('utf-8')
+        previews[fmt] = {
+            'mimetype': f'{mimetype}; charset=utf-8',
+            'body': body,
+            'gzip': gzip.compress(body, compresslevel=6),
+            'etag': f"{fmt}-{hashlib.sha256(body).hexdigest()[:32]}"
+        }
+    return previews
@@ -0,0 +1,76 @@
+import re
+
+# Every section header the AI (or the fallback resume) is known to produce
+SECTION_HEADERS = [
+    'PROFESSIONAL SUMMARY', 'SUMMARY', 'OBJECTIVE', 'CAREER OBJECTIVE', 'PROFILE',
+    'CORE COMPETENCIES', 'KEY SKILLS', 'SKILLS', 'TECHNICAL SKILLS',
+    'PROFESSIONAL EXPERIENCE', 'EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT HISTORY',
+    'EDUCATION', 'ACADEMIC BACKGROUND',
+    'CERTIFICATIONS', 'PROJECTS', 'ACHIEVEMENTS', 'AWARDS', 'LANGUAGES',
+    'PUBLICATIONS', 'VOLUNTEER EXPERIENCE', 'CONTACT', 'CONTACT INFORMATION',
+]
+
+# List-style sections whose header may carry the list inline ("Skills: Python, SQL"); any other
+# header followed by text is ordinary body text, e.g. "Summary: Led a team of five" in a role
+INLINE_SECTIONS = {'CORE COMPETENCIES', 'KEY SKILLS', 'SKILLS', 'TECHNICAL SKILLS'}
+
+
+def _build_pattern(headers):
+    # Longest first so 'TECHNICAL SKILLS' wins over 'SKILLS'
+    alternation = '|'.join(
+        re.escape(header).replace(r'\ ', r'\s+')
+        for header in sorted(headers, key=len, reverse=True)
+    )
+    return re.compile(
+        r'^[\s#>*_]*'                       # markdown heading / emphasis markers
+        r'(?:(?:\d+|[ivx]+)[.)]\s*)?'       # "1." / "IV)" numbering
+        r'[*_]*(?P<title>' + alternation + r')[*_]*\s*'
+        r'(?::[*_]*\s*(?P<rest>.*?))?'      # "Skills: Python, SQL" (see INLINE_SECTIONS)
+        r'[\s*_]*$',
+        re.IGNORECASE
+    )
+
+
+_HEADER_RE = _build_pattern(SECTION_HEADERS)
+
+
+def match_header(line):
+    """Return (TITLE, inline_content) if the line is a section header, else None"""
+    match = _HEADER_RE.match(line)
+    if not match:
+        return None
+    title = ' '.join(match.group('title').upper().split())
+    rest = (match.group('rest') or '').strip()
+    if rest and title not in INLINE_SECTIONS:
+        return None
+    return title, rest
+
+
+def is_header(line):
+    return match_header(line) is not None
+
+
+def split_sections(text):
+    """Split resume text into [(TITLE, content)] using the shared header classifier"""
+    sections = []
+    current_section = None
+    current_content = []
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        header = match_header(line)
+        if header:
+            if current_section:
+                sections.append((current_section, '\n'.join(current_content)))
+            current_section, rest = header
+            current_content = [rest] if rest else []
+        else:
+            current_content.append(line)
+
+    if current_section:
+        sections.append((current_section, '\n'.join(current_content)))
+
+    return sections
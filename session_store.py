@@ -0,0 +1,338 @@
+from collections import OrderedDict
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# Session fields kept out of the session record and loaded only by the endpoints that serve them
+BLOB_FIELDS = ('resume_content', 'pdf_data', 'previews')
+
+
+def estimate_size(value):
+    """Rough in-memory size of a session value, in bytes"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict):
+        return sum(len(str(key)) + estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    return 16
+
+
+def split_fields(fields, blob_fields=BLOB_FIELDS):
+    """Separate small inline fields from blobs stored by reference"""
+    inline = {key: value for key, value in fields.items() if key not in blob_fields}
+    blobs = {key: value for key, value in fields.items() if key in blob_fields}
+    return inline, blobs
+
+
+class MemorySessionStore:
+    """In-process session store with TTL, LRU eviction and a memory cap"""
+
+    def __init__(self, ttl=None, max_sessions=None, max_bytes=None):
+        self.ttl = ttl if ttl is not None else float(os.getenv('SESSION_TTL', '3600'))
+        self.max_sessions = max_sessions or int(os.getenv('SESSION_MAX', '10000'))
+        self.max_bytes = max_bytes or int(float(os.getenv('SESSION_MAX_MB', '256')) * 1024 * 1024)
+
+        # session_id -> {'fields', 'blobs', 'size', 'accessed_at'}, least recently used first
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'created': 0,
+            'expired': 0,
+            'evictions': 0,
+        }
+
+    def create(self, session_id, fields):
+        """Start a session with its initial fields"""
+        inline, blobs = split_fields(fields)
+        with self._lock:
+            self._discard(session_id)
+            self._sessions[session_id] = {'fields': {}, 'blobs': {}, 'size': 0, 'accessed_at': time.time()}
+            self._apply(session_id, inline, blobs)
+            self.stats['created'] += 1
+            self._evict()
+
+    def update(self, session_id, **fields):
+        """Merge fields into a live session; returns False if it is unknown or expired"""
+        inline, blobs = split_fields(fields)
+        with self._lock:
+            if not self._touch(session_id):
+                return False
+            self._apply(session_id, inline, blobs)
+            self._evict()
+            return True
+
+    def get(self, session_id):
+        """Return a copy of the session's inline fields, or None"""
+        with self._lock:
+            entry = self._touch(session_id)
+            return dict(entry['fields']) if entry else None
+
+    def get_blob(self, session_id, name, default=None):
+        """Return one blob field of a session"""
+        with self._lock:
+            entry = self._touch(session_id)
+            return entry['blobs'].get(name, default) if entry else default
+
+    def delete(self, session_id):
+        with self._lock:
+            self._discard(session_id)
+
+    def _apply(self, session_id, inline, blobs):
+        entry = self._sessions[session_id]
+        entry['fields'].update(inline)
+        entry['blobs'].update(blobs)
+        size = estimate_size(entry['fields']) + estimate_size(entry['blobs'])
+        self._bytes += size - entry['size']
+        entry['size'] = size
+
+    def _touch(self, session_id):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        now = time.time()
+        if self.ttl and now - entry['accessed_at'] > self.ttl:
+            self._discard(session_id)
+            self.stats['expired'] += 1
+            return None
+        entry['accessed_at'] = now
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _discard(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry:
+            self._bytes -= entry['size']
+
+    def _evict(self):
+        now = time.time()
+        # The most recently used session always stays, even if it alone exceeds the cap
+        while len(self._sessions) > 1:
+            session_id, entry = next(iter(self._sessions.items()))
+            if self.ttl and now - entry['accessed_at'] > self.ttl:
+                self.stats['expired'] += 1
+            elif len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes:
+                self.stats['evictions'] += 1
+            else:
+                break
+            self._discard(session_id)
+
+    def get_stats(self):
+        """Return counters plus current session count and memory use"""
+        with self._lock:
+            return dict(self.stats, backend='memory', sessions=len(self._sessions),
+                        bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+class SQLiteSessionStore:
+    """Session store in a SQLite file so every worker process sees the same sessions"""
+
+    def __init__(self, path=None, ttl=None, max_sessions=None, max_bytes=None):
+        self.path = path or os.getenv('SESSION_DB_PATH', os.path.join('cache', 'sessions.sqlite3'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('SESSION_TTL', '3600'))
+        self.max_sessions = max_sessions or int(os.getenv('SESSION_MAX', '10000'))
+        self.max_bytes = max_bytes or int(float(os.getenv('SESSION_MAX_MB', '256')) * 1024 * 1024)
+        # Reads move a session up the LRU order at most this often, so they rarely need to write
+        self.touch_interval = min(60.0, self.ttl / 10) if self.ttl else 60.0
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'created': 0,
+            'expired': 0,
+            'evictions': 0,
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        with conn:
+            # WAL lets other workers read while one of them writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_blobs (
+                    session_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (session_id, name)
+                )
+            """)
+        conn.close()
+
+    def _connect(self, write=True):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        # Writers serialize read-modify-write across processes; readers take a deferred
+        # transaction, which under WAL neither waits for nor blocks a writer
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        return _Transaction(conn)
+
+    def create(self, session_id, fields):
+        """Start a session with its initial fields"""
+        inline, blobs = split_fields(fields)
+        with self._lock, self._connect() as conn:
+            self._discard(conn, session_id)
+            self._write(conn, session_id, inline, blobs)
+            self.stats['created'] += 1
+            self._evict(conn, session_id)
+
+    def update(self, session_id, **fields):
+        """Merge fields into a live session; returns False if it is unknown or expired"""
+        inline, blobs = split_fields(fields)
+        with self._lock, self._connect() as conn:
+            current = self._touch(conn, session_id)
+            if current is None:
+                return False
+            current.update(inline)
+            self._write(conn, session_id, current, blobs)
+            self._evict(conn, session_id)
+            return True
+
+    def get(self, session_id):
+        """Return the session's inline fields, or None"""
+        with self._connect(write=False) as conn:
+            row = self._read(conn, session_id)
+        if row is None:
+            return None
+        self._refresh(session_id, row[1])
+        return json.loads(row[0])
+
+    def get_blob(self, session_id, name, default=None):
+        """Return one blob field of a session"""
+        with self._connect(write=False) as conn:
+            row = self._read(conn, session_id)
+            if row is None:
+                return default
+            blob = conn.execute(
+                "SELECT data FROM session_blobs WHERE session_id = ? AND name = ?", (session_id, name)
+            ).fetchone()
+        self._refresh(session_id, row[1])
+        return pickle.loads(blob[0]) if blob else default
+
+    def delete(self, session_id):
+        with self._lock, self._connect() as conn:
+            self._discard(conn, session_id)
+
+    def _write(self, conn, session_id, inline, blobs):
+        data = json.dumps(inline)
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (id, data, size, accessed_at) VALUES (?, ?, ?, ?)",
+            (session_id, data, len(data), time.time())
+        )
+        for name, value in blobs.items():
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            conn.execute(
+                "INSERT OR REPLACE INTO session_blobs (session_id, name, data, size) VALUES (?, ?, ?, ?)",
+                (session_id, name, blob, len(blob))
+            )
+
+    def _touch(self, conn, session_id):
+        row = conn.execute("SELECT data, accessed_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if self.ttl and now - row[1] > self.ttl:
+            self._discard(conn, session_id)
+            self.stats['expired'] += 1
+            return None
+        conn.execute("UPDATE sessions SET accessed_at = ? WHERE id = ?", (now, session_id))
+        return json.loads(row[0])
+
+    def _read(self, conn, session_id):
+        """Return (data, accessed_at) of a live session without writing; expired rows go at the next write"""
+        row = conn.execute("SELECT data, accessed_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            return None
+        return row
+
+    def _refresh(self, session_id, accessed_at):
+        now = time.time()
+        if now - accessed_at < self.touch_interval:
+            return
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE sessions SET accessed_at = ? WHERE id = ?", (now, session_id))
+
+    def _discard(self, conn, session_id):
+        conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        conn.execute("DELETE FROM session_blobs WHERE session_id = ?", (session_id,))
+
+    def _evict(self, conn, keep):
+        if self.ttl:
+            expired = conn.execute(
+                "SELECT id FROM sessions WHERE accessed_at < ? AND id != ?", (time.time() - self.ttl, keep)
+            ).fetchall()
+            for (session_id,) in expired:
+                self._discard(conn, session_id)
+                self.stats['expired'] += 1
+
+        count, total = self._usage(conn)
+        if count <= self.max_sessions and total <= self.max_bytes:
+            return
+
+        for session_id, size in conn.execute("""
+            SELECT s.id, s.size + COALESCE((SELECT SUM(b.size) FROM session_blobs b WHERE b.session_id = s.id), 0)
+            FROM sessions s WHERE s.id != ? ORDER BY s.accessed_at ASC
+        """, (keep,)).fetchall():
+            if count <= self.max_sessions and total <= self.max_bytes:
+                break
+            self._discard(conn, session_id)
+            count -= 1
+            total -= size
+            self.stats['evictions'] += 1
+
+    def _usage(self, conn):
+        count, inline = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions").fetchone()
+        blobs = conn.execute("SELECT COALESCE(SUM(size), 0) FROM session_blobs").fetchone()[0]
+        return count, inline + blobs
+
+    def get_stats(self):
+        """Return counters plus current session count and database usage"""
+        with self._connect(write=False) as conn:
+            count, total = self._usage(conn)
+        return dict(self.stats, backend='sqlite', sessions=count, bytes=total, max_bytes=self.max_bytes)
+
+
+class _Transaction:
+    """Commit on success, roll back on error, and always close the connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the process-wide session store (SESSION_BACKEND=memory|sqlite)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if os.getenv('SESSION_BACKEND', 'memory') == 'sqlite':
+                _store = SQLiteSessionStore()
+            else:
+                _store = MemorySessionStore()
+        return _store
@@ -0,0 +1,53 @@
+import threading
+
+
+class SingleFlight:
+    """Registry of in-flight work keyed by request identity, so concurrent duplicates share one run"""
+
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'started': 0,
+            'coalesced': 0,
+        }
+
+    def join_or_start(self, key, start):
+        """
+        Return (value, started): the running value for key, or start() registered as the new one
+
+        start() runs under the registry lock, so keep it quick (e.g. enqueue a job); if it
+        raises, nothing is registered.
+        """
+        with self._lock:
+            if key in self._in_flight:
+                self.stats['coalesced'] += 1
+                return self._in_flight[key], False
+            value = start()
+            self._in_flight[key] = value
+            self.stats['started'] += 1
+            return value, True
+
+    def finish(self, key, value):
+        """Forget key once its run is over, so later requests start fresh"""
+        with self._lock:
+            if self._in_flight.get(key) is value:
+                del self._in_flight[key]
+
+    def get_stats(self):
+        """Return started/coalesced counters and how many runs are in flight"""
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._in_flight))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the process-wide in-flight registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SingleFlight()
+        return _registry